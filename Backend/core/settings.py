@@ -168,6 +168,55 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cached results (recommendations, search, certificate verification) are
+# invalidated by signals in whichever worker handled the change, so the cache
+# must be shared by every process: a table in the main database (create it
+# with `manage.py createcachetable`). Any shared backend such as Redis works too.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+}
+
+# Prebuilt TF-IDF index used by the course recommender (see main/recommendation.py)
+RECOMMENDER_INDEX_PATH = os.path.join(BASE_DIR, 'recommender_index', 'courses.joblib')
+# Out-of-vocabulary token share in patched courses that makes the scheduled run refit the index
+RECOMMENDER_DRIFT_THRESHOLD = 0.2
+# Number of similar courses stored per course in the course_neighbor table
+RECOMMENDER_NEIGHBORS_K = 10
+# Share of the blended item-to-item score that comes from co-enrollment neighbors
+RECOMMENDER_CO_ENROLLMENT_WEIGHT = 0.3
+# Personalized "for you" results are cached per student until their enrollments or reviews change
+RECOMMENDER_FOR_YOU_SIZE = 20
+RECOMMENDER_FOR_YOU_TTL = 60 * 60 * 6
+
+# Course search pages through at most SEARCH_MAX_CANDIDATES ranked hits;
+# clients may ask for up to SEARCH_MAX_PAGE_SIZE results per page
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+SEARCH_MAX_CANDIDATES = 200
+# Each worker's typeahead index rechecks the catalog version this often (seconds),
+# so an edit shows up in suggestions within that delay
+AUTOCOMPLETE_VERSION_CHECK_INTERVAL = 5
+# Ranked search ids are cached per normalized query until a course changes or this expires
+SEARCH_CACHE_TTL = 60 * 10
+
+# Certificates are rendered by `manage.py render_certificates`; a certificate
+# is marked failed after this many rendering errors
+CERTIFICATE_MAX_ATTEMPTS = 3
+# Seconds before a failed render is retried, doubled after each further failure
+CERTIFICATE_RETRY_DELAY = 60
+# Seconds the worker sleeps when the queue is empty
+CERTIFICATE_POLL_INTERVAL = 5
+# Public certificate verification: lookups are cached until the certificate,
+# its student or its course changes (or this expires); unknown ids are cached
+# briefly, and clients and proxies may reuse an answer for CERTIFICATE_VERIFY_MAX_AGE seconds
+CERTIFICATE_VERIFY_TTL = 60 * 60 * 24 * 7
+CERTIFICATE_VERIFY_MISS_TTL = 60
+CERTIFICATE_VERIFY_MAX_AGE = 60 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
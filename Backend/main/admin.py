@@ -2,7 +2,11 @@ from django.contrib import admin
 from .models import Course, Category, Section, Certificate, Enrollment, SectionProgress,Review
 # Register your models here.    
 
-admin.site.register(Course)
+@admin.register(Course)
+class CourseAdmin(admin.ModelAdmin):
+    # Maintained by the Section signals; Course.save never writes it back
+    readonly_fields = ['sections_count']
+
 admin.site.register(Category)
 admin.site.register(Section)
 admin.site.register(Certificate)
@@ -0,0 +1,101 @@
+"""
+Typeahead for the search box, served from a per-process prefix index over the
+published course titles and keywords.
+
+The index is two sorted arrays of normalized terms searched with bisect: full
+titles, and the later words of each title plus every keyword. Matches on the
+start of a title come first. Building it is a single query; after that a
+lookup never touches the database: each worker reads the catalog version
+(main.caching, bumped by the Course and Category signals in whichever worker
+handled the edit) from the shared cache at most once every
+AUTOCOMPLETE_VERSION_CHECK_INTERVAL seconds, and rebuilds the index lazily
+once it has moved.
+"""
+import bisect
+import threading
+import time
+
+from django.conf import settings
+
+from .caching import catalog_version
+from .models import Course
+
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+
+class AutocompleteIndex:
+    def __init__(self, courses):
+        self.courses = []
+        titles, words = [], []
+        for course in courses:
+            row = len(self.courses)
+            self.courses.append({
+                'id': course['id'],
+                'title': course['title'],
+                'slug': course['slug'],
+                'price': str(course['price']),
+            })
+            tokens = normalize(course['title']).split(" ")
+            titles.append((" ".join(tokens), row))
+            # "Advanced Django Projects" is also found by "django" and "proj"
+            words.extend((" ".join(tokens[start:]), row) for start in range(1, len(tokens)))
+            for keyword in (course['keywords'] or "").split(","):
+                if normalize(keyword):
+                    words.append((normalize(keyword), row))
+
+        titles.sort()
+        words.sort()
+        self.title_terms = [term for term, _ in titles]
+        self.title_rows = [row for _, row in titles]
+        self.word_terms = [term for term, _ in words]
+        self.word_rows = [row for _, row in words]
+
+    @classmethod
+    def build(cls):
+        return cls(
+            Course.objects.filter(is_published=True)
+            .values('id', 'title', 'slug', 'keywords', 'price')
+            .iterator()
+        )
+
+    def complete(self, prefix, limit=8):
+        """Courses whose title or keywords start with ``prefix``, title matches first."""
+        prefix = normalize(prefix)
+        if not prefix or limit <= 0:
+            return []
+
+        found, seen = [], set()
+        for terms, rows in ((self.title_terms, self.title_rows), (self.word_terms, self.word_rows)):
+            position = bisect.bisect_left(terms, prefix)
+            while position < len(terms) and terms[position].startswith(prefix) and len(found) < limit:
+                row = rows[position]
+                if row not in seen:
+                    seen.add(row)
+                    found.append(self.courses[row])
+                position += 1
+        return found
+
+
+_index = None
+_index_version = None
+_index_checked_at = None  # time.monotonic() of the last catalog version read
+_index_lock = threading.Lock()
+
+
+def get_autocomplete_index():
+    """This worker's index, rebuilt when the catalog version has moved."""
+    global _index, _index_version, _index_checked_at
+    now = time.monotonic()
+    if _index is not None and now - _index_checked_at < settings.AUTOCOMPLETE_VERSION_CHECK_INTERVAL:
+        return _index
+
+    version = catalog_version()
+    if _index is None or _index_version != version:
+        with _index_lock:
+            if _index is None or _index_version != version:
+                _index = AutocompleteIndex.build()
+                _index_version = version
+    _index_checked_at = now
+    return _index
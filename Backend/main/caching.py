@@ -0,0 +1,55 @@
+"""Cache keys shared by the views that cache results and the signals that invalidate them."""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "catalog:version"
+
+
+def for_you_key(user_id):
+    return f"recommendations:for_you:{user_id}"
+
+
+def invalidate_for_you(user_id):
+    cache.delete(for_you_key(user_id))
+
+
+def certificate_key(certificate_id):
+    return f"certificates:verify:{certificate_id}"
+
+
+def invalidate_certificates(certificate_ids):
+    cache.delete_many([certificate_key(certificate_id) for certificate_id in certificate_ids])
+
+
+def catalog_version():
+    """
+    Version of the course catalog, bumped whenever a course or category is
+    edited. Anything derived from the catalog (the autocomplete index, cached
+    search results) records the version it was built at and is stale once it
+    changes. It lives in the shared cache (CACHES in settings), so the bump
+    made by the worker that handled an edit is seen by every other worker.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Start from the clock so a lost key never repeats an older version
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def search_key(kind, *parts):
+    """
+    Key for cached search data (``kind`` is "ids" or "facets"); includes the
+    catalog version, so course and category edits invalidate it.
+    """
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f"search:{kind}:{catalog_version()}:{digest}"
@@ -0,0 +1,122 @@
+"""
+Certificate rendering queue.
+
+Completing a course only issues a ``pending`` Certificate row; drawing and
+encoding the image happens outside the request, in `manage.py
+render_certificates`. The certificate table is the queue: a worker claims the
+oldest pending row with SELECT ... FOR UPDATE SKIP LOCKED, so several workers
+can drain it side by side and a crashed worker's row simply becomes
+claimable again. A row is marked ``ready`` once its file is stored, or
+``failed`` after CERTIFICATE_MAX_ATTEMPTS errors; in between, a row whose
+render raised waits CERTIFICATE_RETRY_DELAY seconds, doubled after every
+further error, before a worker claims it again. Clients poll the
+certificate's ``status``.
+
+Issuing locks the enrollment row, so the completion events that can race
+(a section marked completed, a test submitted, the generate endpoint) all
+end up with the same single certificate. Rendered files are stored under
+the hash of their content: rendering identical bytes again, e.g. a reissue
+with an unchanged template, writes nothing new.
+"""
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Certificate, Enrollment
+from .utils import generate_certificate_files
+
+
+def issue_certificate(enrollment):
+    """
+    Queue the enrollment's certificate for rendering, once, and return it. A
+    certificate that failed is queued again with a fresh set of attempts.
+    """
+    with transaction.atomic():
+        # Concurrent completion events for the enrollment queue one at a time
+        Enrollment.objects.select_for_update().filter(pk=enrollment.pk).values_list('pk').get()
+        certificate, _ = Certificate.objects.get_or_create(enrollment=enrollment)
+        if certificate.status == Certificate.STATUS_FAILED:
+            certificate.status = Certificate.STATUS_PENDING
+            certificate.attempts = 0
+            certificate.error = ''
+            certificate.next_attempt_at = None
+            certificate.save(update_fields=['status', 'attempts', 'error', 'next_attempt_at'])
+    return certificate
+
+
+def content_addressed_name(file_obj):
+    """certificates/<2 hex>/<sha256 of the content>.<extension>"""
+    digest = hashlib.sha256()
+    for chunk in file_obj.chunks():
+        digest.update(chunk)
+    file_obj.seek(0)
+    content_hash = digest.hexdigest()
+    extension = os.path.splitext(file_obj.name)[1]
+    return f"certificates/{content_hash[:2]}/{content_hash}{extension}"
+
+
+def store_file(file_obj):
+    """Save ``file_obj`` under its content hash, unless those bytes are already stored, and return the name."""
+    name = content_addressed_name(file_obj)
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, file_obj)
+        if saved != name:
+            # Another worker stored the same bytes in the meantime
+            default_storage.delete(saved)
+    return name
+
+
+def render_certificate(certificate):
+    """Render every format of the certificate into its file fields (without saving the row)."""
+    enrollment = certificate.enrollment
+    files = generate_certificate_files(
+        student_name=enrollment.student.full_name,
+        course_name=enrollment.course.title,
+        issued_at=certificate.issued_at,
+        certificate_id=certificate.certificate_id,
+    )
+    for file_format, file_obj in files.items():
+        setattr(certificate, Certificate.FILE_FIELDS[file_format], store_file(file_obj))
+
+
+def render_next_certificate():
+    """
+    Claim the oldest pending certificate that is due and render it. Returns
+    the certificate, or None when no due pending row is left unclaimed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        certificate = (
+            Certificate.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('enrollment__student', 'enrollment__course')
+            .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now), status=Certificate.STATUS_PENDING)
+            .order_by('issued_at', 'id')
+            .first()
+        )
+        if certificate is None:
+            return None
+
+        certificate.attempts += 1
+        try:
+            render_certificate(certificate)
+        except Exception as e:
+            certificate.error = str(e)
+            if certificate.attempts >= settings.CERTIFICATE_MAX_ATTEMPTS:
+                certificate.status = Certificate.STATUS_FAILED
+            else:
+                delay = settings.CERTIFICATE_RETRY_DELAY * 2 ** (certificate.attempts - 1)
+                certificate.next_attempt_at = now + timedelta(seconds=delay)
+        else:
+            certificate.status = Certificate.STATUS_READY
+            certificate.error = ''
+            certificate.rendered_at = timezone.now()
+        certificate.save(update_fields=[
+            *Certificate.FILE_FIELDS.values(), 'status', 'attempts', 'error', 'next_attempt_at', 'rendered_at',
+        ])
+    return certificate
@@ -0,0 +1,120 @@
+"""
+Helpers shared by the bench_* management commands: seeded synthetic course
+catalogs shaped like real Course rows, and latency percentiles.
+
+(The leading underscore keeps Django from listing this module as a command.)
+"""
+import math
+import random
+
+from django.utils.text import slugify
+
+from main.models import Category, Course
+
+# Each synthetic course is written about one topic; courses sharing a topic
+# are the ground truth "similar" courses.
+TOPICS = {
+    "python": ["python", "django", "flask", "pandas", "scripting", "automation", "pytest", "asyncio"],
+    "web": ["html", "css", "javascript", "react", "frontend", "responsive", "tailwind", "browser"],
+    "data": ["statistics", "regression", "visualization", "sql", "analytics", "dashboard", "excel", "forecasting"],
+    "ml": ["machine", "learning", "neural", "networks", "classification", "training", "tensorflow", "models"],
+    "cloud": ["aws", "docker", "kubernetes", "deployment", "devops", "containers", "serverless", "linux"],
+    "security": ["security", "encryption", "firewall", "pentesting", "vulnerabilities", "malware", "auth", "networking"],
+    "design": ["figma", "typography", "branding", "illustrator", "layout", "color", "prototyping", "ux"],
+    "business": ["marketing", "startup", "finance", "accounting", "sales", "management", "strategy", "leadership"],
+    "language": ["english", "grammar", "writing", "speaking", "vocabulary", "ielts", "pronunciation", "listening"],
+    "mobile": ["android", "kotlin", "flutter", "ios", "swift", "mobile", "apps", "firebase"],
+    "music": ["guitar", "piano", "chords", "rhythm", "singing", "composition", "harmony", "theory"],
+    "photography": ["camera", "lighting", "portrait", "lightroom", "editing", "exposure", "landscape", "lens"],
+}
+CATEGORIES = {
+    "python": "Programming", "web": "Web Development", "data": "Data Science",
+    "ml": "Data Science", "cloud": "IT & Software", "security": "IT & Software",
+    "design": "Design", "business": "Business", "language": "Languages",
+    "mobile": "Programming", "music": "Music", "photography": "Photography",
+}
+FILLER = [
+    "course", "learn", "complete", "practical", "guide", "beginners", "projects",
+    "hands", "skills", "real", "world", "step", "master", "build", "introduction",
+    "fundamentals", "modern", "professional", "examples", "exercises",
+]
+TITLE_SUFFIXES = ["Bootcamp", "Masterclass", "Essentials", "Crash Course", "From Scratch", "in Practice"]
+
+
+def synthetic_catalog(size, seed=42):
+    """
+    Return ``size`` course records shaped like ``Course.objects.values()``
+    rows (see main.recommendation.COURSE_FIELDS) plus a ``topic`` key that
+    holds the seeded ground truth.
+    """
+    rng = random.Random(seed)
+    levels = [choice for choice, _ in Course.LEVEL_CHOICES]
+    languages = [choice for choice, _ in Course.LANGUAGES_CHOICES]
+    topics = list(TOPICS)
+
+    records = []
+    for number in range(1, size + 1):
+        topic = rng.choice(topics)
+        terms = TOPICS[topic]
+        # Most courses sit in their topic's category, some are filed elsewhere
+        category = CATEGORIES[topic] if rng.random() < 0.8 else CATEGORIES[rng.choice(topics)]
+        # Titles, keywords and descriptions borrow terms from other topics so
+        # the ground truth is not trivially separable
+        other_terms = TOPICS[rng.choice(topics)]
+        title = f"{rng.choice(terms).title()} {rng.choice(other_terms).title()} {rng.choice(TITLE_SUFFIXES)} {number}"
+        description = " ".join(
+            rng.choice(terms) if rng.random() < 0.15 else rng.choice(FILLER + TOPICS[rng.choice(topics)])
+            for _ in range(rng.randint(20, 60))
+        )
+        records.append({
+            'id': number,
+            'slug': slugify(title),
+            'title': title,
+            'keywords': ", ".join(rng.sample(terms, 2) + [rng.choice(other_terms)]),
+            'category__title': category,
+            'description': description,
+            'level': rng.choice(levels),
+            'language': rng.choice(languages),
+            'price': rng.choice([0, 500, 1000, 1500, 2500, 5000]),
+            'topic': topic,
+        })
+    return records
+
+
+def save_catalog(records):
+    """
+    Insert the records as Category/Course rows (call inside a transaction that
+    is rolled back afterwards) and return them with their database ids.
+    """
+    categories = {
+        title: Category.objects.get_or_create(title=title)[0]
+        for title in {record['category__title'] for record in records}
+    }
+    courses = Course.objects.bulk_create(
+        [
+            Course(
+                title=record['title'],
+                slug=record['slug'],
+                keywords=record['keywords'],
+                description=record['description'],
+                level=record['level'],
+                language=record['language'],
+                price=record['price'],
+                category=categories[record['category__title']],
+                is_published=True,
+                is_test_required=False,
+            )
+            for record in records
+        ],
+        batch_size=2000,
+    )
+    return [dict(record, id=course.id) for record, course in zip(records, courses)]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
@@ -0,0 +1,112 @@
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.models import Course
+from main.recommendation import COURSE_FIELDS, RecommendationIndex
+
+from ._benchmarks import percentile, save_catalog, synthetic_catalog
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the course recommender on seeded synthetic catalogs: index "
+        "build time and memory, p50/p99 query latency and precision against "
+        "the catalog's topic ground truth. Runs offline; with --database the "
+        "catalog is written to the configured database inside a transaction "
+        "that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+        parser.add_argument("--queries", type=int, default=200, help="Recommendation lookups timed per catalog.")
+        parser.add_argument("--top-n", type=int, default=4)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--database",
+            action="store_true",
+            help="Insert the catalog and build the index from the database instead of in memory.",
+        )
+        parser.add_argument(
+            "--neighbors",
+            action="store_true",
+            help="Also time the chunked top-K neighbor computation over the whole catalog.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'courses':>8} {'build s':>8} {'peak MB':>8} {'index MB':>9} {'file MB':>8} "
+            f"{'p50 ms':>7} {'p99 ms':>7} {'prec@k':>7} {'nbrs s':>7}"
+        )
+        for size in options["sizes"]:
+            records = synthetic_catalog(size, seed=options["seed"])
+            if options["database"]:
+                try:
+                    with transaction.atomic():
+                        records = save_catalog(records)
+                        row = self.run_catalog(records, options, from_database=True)
+                        raise Rollback
+                except Rollback:
+                    pass
+            else:
+                row = self.run_catalog(records, options)
+            self.stdout.write(row)
+
+    def run_catalog(self, records, options, from_database=False):
+        tracemalloc.start()
+        started = time.perf_counter()
+        source = records
+        if from_database:
+            # Only the synthetic courses, not published courses already in the database
+            ids = [record['id'] for record in records]
+            source = (
+                Course.objects.filter(id__range=(min(ids), max(ids)), is_published=True)
+                .order_by('id').values(*COURSE_FIELDS)
+            )
+        index = RecommendationIndex.build(source)
+        build_time = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        matrix = index.matrix
+        index_bytes = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "courses.joblib")
+            index.save(path)
+            file_bytes = os.path.getsize(path)
+
+        # Time lookups for a seeded sample of courses and score them against
+        # the topic ground truth
+        topics = {record['id']: record['topic'] for record in records}
+        sample = random.Random(options["seed"]).sample(records, min(options["queries"], len(records)))
+        latencies, relevant, returned = [], 0, 0
+        for record in sample:
+            started = time.perf_counter()
+            hits = index.similar(record['slug'], top_n=options["top_n"])
+            latencies.append(time.perf_counter() - started)
+            returned += len(hits)
+            relevant += sum(1 for course_id, _ in hits if topics.get(course_id) == record['topic'])
+        precision = relevant / returned if returned else 0.0
+
+        neighbor_time = ""
+        if options["neighbors"]:
+            started = time.perf_counter()
+            for _ in index.neighbors():
+                pass
+            neighbor_time = f"{time.perf_counter() - started:.1f}"
+
+        mb = 1024 * 1024
+        return (
+            f"{len(records):>8} {build_time:>8.2f} {peak / mb:>8.1f} {index_bytes / mb:>9.1f} "
+            f"{file_bytes / mb:>8.1f} {percentile(latencies, 50) * 1000:>7.2f} "
+            f"{percentile(latencies, 99) * 1000:>7.2f} {precision:>7.3f} {neighbor_time:>7}"
+        )
@@ -0,0 +1,218 @@
+import json
+import random
+import time
+from math import log2
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from main import search
+from main.models import Course
+
+from ._benchmarks import TOPICS, percentile, save_catalog, synthetic_catalog
+
+
+class Rollback(Exception):
+    pass
+
+
+def typo(term, rng):
+    """One random edit (drop, swap, duplicate or replace a letter), as typed in a hurry."""
+    if len(term) < 4:
+        return term
+    position = rng.randrange(1, len(term) - 1)
+    edit = rng.choice(["drop", "swap", "double", "replace"])
+    if edit == "drop":
+        return term[:position] + term[position + 1:]
+    if edit == "swap":
+        return term[:position - 1] + term[position] + term[position - 1] + term[position + 1:]
+    if edit == "double":
+        return term[:position] + term[position] + term[position:]
+    return term[:position] + rng.choice("abcdefghijklmnopqrstuvwxyz") + term[position + 1:]
+
+
+def synthetic_query_log(count, seed):
+    """(kind, query, topic) triples: single terms, two-term phrases and typos of a topic's terms."""
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+    log = []
+    for _ in range(count):
+        topic = rng.choice(topics)
+        kind = rng.choice(["term", "phrase", "typo"])
+        if kind == "phrase":
+            query = " ".join(rng.sample(TOPICS[topic], 2))
+        elif kind == "typo":
+            query = typo(rng.choice(TOPICS[topic]), rng)
+        else:
+            query = rng.choice(TOPICS[topic])
+        log.append((kind, query, topic))
+    return log
+
+
+def read_query_log(path):
+    """One query per line, optionally followed by a tab and the topic its relevant courses belong to."""
+    log = []
+    with open(path) as handle:
+        for line in handle:
+            query, _, topic = line.rstrip("\n").partition("\t")
+            if query.strip():
+                log.append(("log", query, topic.strip() or None))
+    return log
+
+
+def reciprocal_rank(relevance):
+    for rank, relevant in enumerate(relevance, start=1):
+        if relevant:
+            return 1 / rank
+    return 0.0
+
+
+def ndcg(relevance, total_relevant, k):
+    dcg = sum(1 / log2(rank + 1) for rank, relevant in enumerate(relevance[:k], start=1) if relevant)
+    ideal = sum(1 / log2(rank + 1) for rank in range(1, min(k, total_relevant) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+def rows_scanned(plan):
+    """Rows read by every scan node of an EXPLAIN (ANALYZE, FORMAT JSON) plan, filtered rows included."""
+    total = 0
+    if "Scan" in plan["Node Type"]:
+        rows = plan.get("Actual Rows", 0) + plan.get("Rows Removed by Filter", 0)
+        rows += plan.get("Rows Removed by Index Recheck", 0)
+        total += rows * plan.get("Actual Loops", 1)
+    for child in plan.get("Plans", []):
+        total += rows_scanned(child)
+    return total
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark course search ranking (main.search.ranked_course_ids) on a "
+        "seeded synthetic catalog: replays a query log and reports latency "
+        "percentiles, rows scanned per search from EXPLAIN ANALYZE, and MRR and "
+        "nDCG against the catalog's topic ground truth. The catalog is written "
+        "inside a transaction that is rolled back; Postgres needs pg_trgm."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=10000, help="Synthetic courses to load.")
+        parser.add_argument("--queries", type=int, default=300, help="Synthetic queries to generate.")
+        parser.add_argument(
+            "--query-log",
+            help="Replay this file instead: one query per line, optionally '<tab>topic' for relevance.",
+        )
+        parser.add_argument("--top-k", type=int, default=10, help="Cut-off for nDCG.")
+        parser.add_argument("--explain", type=int, default=50, help="Queries to run under EXPLAIN ANALYZE.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--thresholds", type=float, nargs=2, metavar=("SHORT", "LONG"),
+            help="Override search.TRIGRAM_THRESHOLDS for this run.",
+        )
+        parser.add_argument(
+            "--weight", action="append", default=[], metavar="NAME=VALUE",
+            help="Override one of search.TRIGRAM_WEIGHTS for this run (repeatable).",
+        )
+        parser.add_argument("--min-full-text-hits", type=int, help="Override search.MIN_FULL_TEXT_HITS.")
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                raise CommandError("The pg_trgm extension is not installed in this database.")
+
+        self.configure(options)
+        if options["query_log"]:
+            log = read_query_log(options["query_log"])
+        else:
+            log = synthetic_query_log(options["queries"], options["seed"])
+
+        self.stdout.write(
+            f"thresholds {search.TRIGRAM_THRESHOLDS}  weights {search.TRIGRAM_WEIGHTS}  "
+            f"min full-text hits {search.MIN_FULL_TEXT_HITS}"
+        )
+        try:
+            with transaction.atomic():
+                records = save_catalog(synthetic_catalog(options["size"], seed=options["seed"]))
+                with connection.cursor() as cursor:
+                    # Fresh statistics so the planner sees the catalog it will search
+                    cursor.execute("ANALYZE course")
+                results = self.replay(records, log, options)
+                raise Rollback
+        except Rollback:
+            pass
+        self.report(results, len(records), options["top_k"])
+
+    def configure(self, options):
+        if options["thresholds"]:
+            search.TRIGRAM_THRESHOLDS = tuple(options["thresholds"])
+        weights = dict(search.TRIGRAM_WEIGHTS)
+        for override in options["weight"]:
+            name, _, value = override.partition("=")
+            if name not in weights:
+                raise CommandError(f"Unknown weight {name!r}, expected one of {', '.join(weights)}")
+            weights[name] = float(value)
+        search.TRIGRAM_WEIGHTS = weights
+        if options["min_full_text_hits"] is not None:
+            search.MIN_FULL_TEXT_HITS = options["min_full_text_hits"]
+
+    def replay(self, records, log, options):
+        topics = {record['id']: record['topic'] for record in records}
+        topic_sizes = {}
+        for topic in topics.values():
+            topic_sizes[topic] = topic_sizes.get(topic, 0) + 1
+        courses = Course.objects.filter(is_published=True)
+        explain_every = max(1, len(log) // options["explain"]) if options["explain"] else 0
+
+        # Warm up the plan cache and the GIN/trigram indexes
+        for _, query, _ in log[:10]:
+            search.ranked_course_ids(courses, query)
+
+        results = []
+        for number, (kind, query, topic) in enumerate(log):
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                ids = search.ranked_course_ids(courses, query)
+            elapsed = time.perf_counter() - started
+
+            result = {"kind": kind, "latency": elapsed, "fallback": len(captured.captured_queries) > 1}
+            if topic:
+                relevance = [topics.get(course_id) == topic for course_id in ids]
+                result["mrr"] = reciprocal_rank(relevance)
+                result["ndcg"] = ndcg(relevance, topic_sizes.get(topic, 0), options["top_k"])
+            if explain_every and number % explain_every == 0:
+                result["rows"] = self.explain(captured.captured_queries)
+            results.append(result)
+        return results
+
+    def explain(self, queries):
+        scanned = 0
+        with connection.cursor() as cursor:
+            for query in queries:
+                cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query["sql"])
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                scanned += rows_scanned(plan[0]["Plan"])
+        return scanned
+
+    def report(self, results, size, top_k):
+        self.stdout.write(
+            f"{size} courses\n"
+            f"{'kind':>8} {'queries':>8} {'fallback':>9} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+            f"{'rows scanned':>13} {'MRR':>6} {f'nDCG@{top_k}':>8}"
+        )
+        kinds = sorted({result["kind"] for result in results})
+        for kind in kinds + ["all"]:
+            rows = [result for result in results if kind in ("all", result["kind"])]
+            latencies = [result["latency"] * 1000 for result in rows]
+            scanned = [result["rows"] for result in rows if "rows" in result]
+            judged = [result for result in rows if "mrr" in result]
+            self.stdout.write(
+                f"{kind:>8} {len(rows):>8} {sum(result['fallback'] for result in rows) / len(rows):>9.0%} "
+                f"{percentile(latencies, 50):>7.2f} {percentile(latencies, 95):>7.2f} "
+                f"{percentile(latencies, 99):>7.2f} "
+                f"{(sum(scanned) / len(scanned) if scanned else 0):>13.0f} "
+                f"{(sum(r['mrr'] for r in judged) / len(judged) if judged else 0):>6.3f} "
+                f"{(sum(r['ndcg'] for r in judged) / len(judged) if judged else 0):>8.3f}"
+            )
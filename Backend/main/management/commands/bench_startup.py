@@ -0,0 +1,78 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Packages only the recommender needs; none of them should load at worker boot
+HEAVY_PACKAGES = ("pandas", "sklearn", "scipy", "numpy", "nltk", "joblib")
+
+SCENARIOS = [
+    # What a worker imports before serving its first request
+    ("worker boot", "import core.wsgi, core.urls"),
+    # The same boot with the recommender engine loaded eagerly, as main.views used to
+    ("worker boot + recommender", "import core.wsgi, core.urls, main.recommendation"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold boot time of core.wsgi in fresh interpreters and how much "
+        "of it is spent importing the recommender's scientific stack."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per scenario.")
+
+    def handle(self, *args, **options):
+        env = os.environ.copy()
+        env.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+        medians = {}
+        for label, snippet in SCENARIOS:
+            wall_times, heavy_times, loaded = [], [], set()
+            for _ in range(options["runs"]):
+                wall, heavy = self.boot(snippet, env)
+                wall_times.append(wall)
+                heavy_times.append(sum(heavy.values()))
+                loaded.update(heavy)
+
+            medians[label] = statistics.median(wall_times)
+            self.stdout.write(
+                f"{label:<28} median {medians[label] * 1000:8.1f} ms  "
+                f"(min {min(wall_times) * 1000:.1f}, max {max(wall_times) * 1000:.1f})  "
+                f"heavy imports {statistics.median(heavy_times) * 1000:.1f} ms "
+                f"[{', '.join(sorted(loaded)) or 'none'}]"
+            )
+
+        boot, eager = (medians[label] for label, _ in SCENARIOS)
+        self.stdout.write(self.style.SUCCESS(
+            f"Lazy recommender import saves {(eager - boot) * 1000:.1f} ms per worker boot"
+        ))
+
+    def boot(self, snippet, env):
+        """Run the snippet in a new interpreter; return wall time and per-package import time."""
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", snippet],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        wall = time.perf_counter() - started
+
+        # -X importtime lines look like "import time:  self [us] | cumulative | package"
+        heavy = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or line.count("|") != 2:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|")
+            package = name.strip().split(".")[0]
+            if package in HEAVY_PACKAGES and self_us.strip().isdigit():
+                heavy[package] = heavy.get(package, 0) + int(self_us) / 1_000_000
+        return wall, heavy
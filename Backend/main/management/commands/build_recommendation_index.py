@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from main.recommendation import get_index, index_path, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Fit the course recommendation TF-IDF index and store it on disk. "
+        "Run it on a schedule with --if-drifted so the index is only refitted "
+        "once course edits have drifted away from the frozen vocabulary."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-drifted",
+            action="store_true",
+            help="Only refit when the stored index reports vocabulary drift above the threshold.",
+        )
+
+    def handle(self, *args, **options):
+        if options["if_drifted"]:
+            index = get_index()
+            if not index.needs_refit:
+                self.stdout.write(f"Vocabulary drift is {index.drift:.2f}, refit not needed")
+                return
+
+        index = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(index.course_ids)} published courses into {index_path()}"
+        ))
@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main.models import CourseNeighbor
+from main.recommendation import (
+    get_index, rebuild_index, store_co_enrollment_neighbors, store_neighbors,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the top-K similar courses of every published course and "
+        "store them in the course_neighbor table, from course content "
+        "(TF-IDF), from co-enrollments, or both."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            choices=[CourseNeighbor.SOURCE_CONTENT, CourseNeighbor.SOURCE_CO_ENROLLMENT, "all"],
+            default="all",
+            help="Which neighbor lists to recompute.",
+        )
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=settings.RECOMMENDER_NEIGHBORS_K,
+            help="Neighbors stored per course.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Rows multiplied against the catalog per sparse product.",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Refit the TF-IDF index before computing content neighbors.",
+        )
+
+    def handle(self, *args, **options):
+        source = options["source"]
+
+        if source in (CourseNeighbor.SOURCE_CONTENT, "all"):
+            started = time.perf_counter()
+            index = rebuild_index() if options["rebuild"] else get_index()
+            written = store_neighbors(index, top_k=options["top_k"], chunk_size=options["chunk_size"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Stored {written} content neighbors for {len(index.course_ids)} courses "
+                f"in {time.perf_counter() - started:.1f}s"
+            ))
+
+        if source in (CourseNeighbor.SOURCE_CO_ENROLLMENT, "all"):
+            started = time.perf_counter()
+            written = store_co_enrollment_neighbors(top_k=options["top_k"], chunk_size=options["chunk_size"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Stored {written} co-enrollment neighbors in {time.perf_counter() - started:.1f}s"
+            ))
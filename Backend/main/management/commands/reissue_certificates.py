@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main.certificates import store_file
+from main.models import Certificate
+from main.utils import generate_certificate_files
+
+CERTIFICATE_FIELDS = (
+    'id', 'certificate_id', 'issued_at', *Certificate.FILE_FIELDS.values(),
+    'enrollment__student__full_name', 'enrollment__course__title',
+)
+
+
+def render_to_storage(row):
+    """
+    Worker: render every format of one certificate and write the files to
+    storage. Returns (id, {field: new file name}, old file names, error);
+    only names go back to the parent, never image bytes. Workers do not
+    touch the database.
+    """
+    try:
+        files = generate_certificate_files(
+            student_name=row['enrollment__student__full_name'],
+            course_name=row['enrollment__course__title'],
+            issued_at=row['issued_at'],
+            certificate_id=row['certificate_id'],
+        )
+        names = {
+            Certificate.FILE_FIELDS[file_format]: store_file(file_obj)
+            for file_format, file_obj in files.items()
+        }
+        old_names = [row[field] for field in names if row[field]]
+        return row['id'], names, old_names, None
+    except Exception as e:
+        return row['id'], None, None, str(e)
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-render the files of every ready certificate, e.g. after changing "
+        "the template or fonts. Certificates are read in id-ordered chunks "
+        "and rendered in parallel by a process pool; the last finished id is "
+        "written to a checkpoint file, so an interrupted run resumes where it "
+        "stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Rendering processes.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Certificates read and rendered per chunk.")
+        parser.add_argument(
+            "--checkpoint",
+            default="reissue_certificates.checkpoint",
+            help="File holding the last reissued certificate id.",
+        )
+        parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the first certificate.")
+
+    def handle(self, *args, **options):
+        checkpoint = options["checkpoint"]
+        last_id = 0 if options["restart"] else self.read_checkpoint(checkpoint)
+        certificates = Certificate.objects.filter(status=Certificate.STATUS_READY)
+        total = certificates.filter(id__gt=last_id).count()
+        if last_id:
+            self.stdout.write(f"Resuming after certificate id {last_id}")
+
+        reissued = failed = 0
+        started = time.perf_counter()
+        # Spawned, not forked: the pool starts its workers lazily, after the
+        # parent has queried again, and a forked worker would inherit (and
+        # could close) the parent's open database connection
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], mp_context=multiprocessing.get_context("spawn"), initializer=django.setup
+        ) as executor:
+            while True:
+                rows = list(
+                    certificates.filter(id__gt=last_id).order_by('id').values(*CERTIFICATE_FIELDS)[:options["chunk_size"]]
+                )
+                if not rows:
+                    break
+                chunksize = max(1, len(rows) // (options["workers"] * 4))
+                results = list(executor.map(render_to_storage, rows, chunksize=chunksize))
+
+                done = self.store(results)
+                reissued += done
+                failed += len(results) - done
+                last_id = rows[-1]['id']
+                self.write_checkpoint(checkpoint, last_id)
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{reissued + failed}/{total} certificates ({failed} failed), "
+                    f"{(reissued + failed) / elapsed:.0f}/s"
+                )
+
+        # Finished: the next run starts from the first certificate again
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(f"Reissued {reissued} certificates, {failed} failed"))
+
+    def store(self, results):
+        """Point the chunk's rows at their new files, then delete the replaced ones."""
+        now = timezone.now()
+        updated, replaced = [], []
+        for certificate_id, names, old_names, error in results:
+            if error:
+                self.stderr.write(f"Certificate id {certificate_id} failed: {error}")
+                continue
+            updated.append(Certificate(id=certificate_id, rendered_at=now, **names))
+            replaced.extend(name for name in old_names if name not in names.values())
+        Certificate.objects.bulk_update(updated, [*Certificate.FILE_FIELDS.values(), 'rendered_at'])
+        for name in replaced:
+            default_storage.delete(name)
+        return len(updated)
+
+    def read_checkpoint(self, path):
+        try:
+            with open(path) as handle:
+                return int(handle.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def write_checkpoint(self, path, last_id):
+        # Write then rename, so an interrupted run never leaves a torn checkpoint
+        with open(f"{path}.tmp", "w") as handle:
+            handle.write(str(last_id))
+        os.replace(f"{path}.tmp", path)
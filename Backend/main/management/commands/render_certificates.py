@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from main.certificates import render_next_certificate
+from main.models import Certificate
+
+
+class Command(BaseCommand):
+    help = (
+        "Render pending certificates (see main.certificates). Runs until "
+        "stopped, polling the queue when it is empty; with --once it drains "
+        "the queue and exits, e.g. from cron. Several workers can run at once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit once no pending certificate is left.")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.CERTIFICATE_POLL_INTERVAL,
+            help="Seconds to wait before looking at an empty queue again.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            ready, failed = self.drain()
+            if ready or failed:
+                self.stdout.write(self.style.SUCCESS(f"Rendered {ready} certificates, {failed} failed"))
+            if options["once"]:
+                return
+            time.sleep(options["poll_interval"])
+
+    def drain(self):
+        ready = failed = 0
+        while (certificate := render_next_certificate()) is not None:
+            if certificate.status == Certificate.STATUS_READY:
+                ready += 1
+            elif certificate.status == Certificate.STATUS_FAILED:
+                failed += 1
+                self.stderr.write(f"Certificate {certificate.certificate_id} failed: {certificate.error}")
+        return ready, failed
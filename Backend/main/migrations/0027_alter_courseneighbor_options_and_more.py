@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0026_courseneighbor'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='courseneighbor',
+            options={'ordering': ['course', 'source', 'rank'], 'verbose_name_plural': 'Course Neighbors'},
+        ),
+        migrations.RemoveIndex(
+            model_name='courseneighbor',
+            name='course_neig_course__6217c2_idx',
+        ),
+        migrations.AlterUniqueTogether(
+            name='courseneighbor',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='courseneighbor',
+            name='source',
+            field=models.CharField(choices=[('content', 'Content (TF-IDF)'), ('co_enrollment', 'Co-enrollment')], default='content', max_length=20),
+        ),
+        migrations.AlterUniqueTogether(
+            name='courseneighbor',
+            unique_together={('course', 'neighbor', 'source')},
+        ),
+        migrations.AddIndex(
+            model_name='courseneighbor',
+            index=models.Index(fields=['course', 'source', 'rank'], name='course_neig_course__5ae088_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:51
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Course.search_vector is kept current by the database so every write path
+# (admin, API, bulk_create, raw SQL) is covered: a BEFORE trigger recomputes it
+# when a course's text columns or category change, and renaming a category
+# touches its courses so their vectors pick up the new title.
+CREATE_TRIGGERS = """
+CREATE OR REPLACE FUNCTION course_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.keywords, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(
+            (SELECT title FROM category WHERE id = NEW.category_id), '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER course_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title, keywords, description, category_id ON course
+FOR EACH ROW EXECUTE FUNCTION course_search_vector_update();
+
+CREATE OR REPLACE FUNCTION category_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    IF NEW.title IS DISTINCT FROM OLD.title THEN
+        UPDATE course SET title = title WHERE category_id = NEW.id;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER category_search_vector_trigger
+AFTER UPDATE OF title ON category
+FOR EACH ROW EXECUTE FUNCTION category_search_vector_update();
+
+UPDATE course SET title = title;
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS category_search_vector_trigger ON category;
+DROP FUNCTION IF EXISTS category_search_vector_update();
+DROP TRIGGER IF EXISTS course_search_vector_trigger ON course;
+DROP FUNCTION IF EXISTS course_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0027_alter_courseneighbor_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='course_search_vector'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS, DROP_TRIGGERS),
+    ]
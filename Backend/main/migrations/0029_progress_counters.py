@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_progress(apps, schema_editor):
+    Course = apps.get_model('main', 'Course')
+    Section = apps.get_model('main', 'Section')
+    Enrollment = apps.get_model('main', 'Enrollment')
+    SectionProgress = apps.get_model('main', 'SectionProgress')
+
+    sections = (
+        Section.objects.filter(course=OuterRef('pk'))
+        .order_by().values('course').annotate(total=Count('id')).values('total')
+    )
+    Course.objects.update(sections_count=Coalesce(Subquery(sections), Value(0)))
+
+    completed = (
+        SectionProgress.objects.filter(enrollment=OuterRef('pk'), is_completed=True)
+        .order_by().values('enrollment').annotate(total=Count('id')).values('total')
+    )
+    Enrollment.objects.update(completed_sections_count=Coalesce(Subquery(completed), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0028_course_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='sections_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_sections_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+def mark_rendered(apps, schema_editor):
+    # Certificates issued before the queue were rendered inline
+    Certificate = apps.get_model('main', 'Certificate')
+    Certificate.objects.exclude(certificate_file='').update(status='ready', rendered_at=models.F('issued_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0029_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='rendered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='certificate',
+            name='certificate_file',
+            field=models.FileField(blank=True, upload_to='certificates/%Y/%m/%d/'),
+        ),
+        migrations.AddIndex(
+            model_name='certificate',
+            index=models.Index(fields=['status', 'issued_at'], name='certificate_queue'),
+        ),
+        migrations.RunPython(mark_rendered, migrations.RunPython.noop),
+    ]
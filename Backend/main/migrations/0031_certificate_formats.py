@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0030_certificate_render_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='certificate_pdf',
+            field=models.FileField(blank=True, upload_to='certificates/%Y/%m/%d/'),
+        ),
+        migrations.AddField(
+            model_name='certificate',
+            name='certificate_preview',
+            field=models.FileField(blank=True, upload_to='certificates/%Y/%m/%d/'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0031_certificate_formats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='certificate',
+            name='certificate_id',
+            field=models.CharField(blank=True, max_length=32, unique=True),
+        ),
+    ]
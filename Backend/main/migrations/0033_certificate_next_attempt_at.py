@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0032_certificate_id_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
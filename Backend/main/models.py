@@ -1,5 +1,5 @@
 from modulefinder import test
-from django.db import models
+from django.db import models, transaction
 from users.models import UserAccount
 
 from django.utils.text import slugify
@@ -7,6 +7,8 @@ from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError  
 from django.utils import timezone
 from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Greatest
 from django.core.validators import FileExtensionValidator
 
 
@@ -100,6 +102,7 @@ class Course(models.Model):
     average_rating = models.FloatField(default=0)
     total_reviews = models.PositiveIntegerField(default=0) 
     total_students = models.PositiveIntegerField(default=0) # Total number of students enrolled in the course
+    sections_count = models.PositiveIntegerField(default=0) # kept in step by the Section signals
    
     
     # course conrent/features
@@ -128,9 +131,22 @@ class Course(models.Model):
     is_published=models.BooleanField(default=False)
     
     is_test_required = models.BooleanField(default=True)
+    # weighted title(A)/keywords(B)/category(C)/description(D) tsvector,
+    # maintained by the course_search_vector_update trigger (migration 0028)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
     def save(self,*args,**kwargs):
         if not self.slug:
             self.slug=slugify(self.title)
+        # sections_count only changes through the Section signals' UPDATEs
+        # (services.adjust_course_sections), so a plain save() of a course
+        # loaded before a section was added or deleted must not write back its
+        # stale value: it saves every other field. Callers that really mean to
+        # set the counter pass update_fields=['sections_count'] explicitly.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'sections_count'
+            ]
         super().save(*args, **kwargs)
     
     def __str__(self):
@@ -165,6 +181,7 @@ class Course(models.Model):
         indexes=[
             GinIndex(fields=["title"],name='title_trgm',opclasses=['gin_trgm_ops']),
             GinIndex(fields=["keywords"],name='keywords_trgm',opclasses=['gin_trgm_ops']),
+            GinIndex(fields=["search_vector"],name='course_search_vector'),
         ]
 
 
@@ -235,6 +252,8 @@ class Enrollment(models.Model):
     )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_progress')
     progress = models.FloatField(default=0)
+    # kept in step by SectionProgress.save and the SectionProgress delete signal
+    completed_sections_count = models.PositiveIntegerField(default=0)
     last_accessed = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -251,9 +270,12 @@ class Enrollment(models.Model):
         return f"{self.student.full_name} -> {self.course.title} ({self.status})"
 
     def update_progress(self):
-        total_sections = self.course.sections.count()
-        completed_sections = self.section_progresses.filter(is_completed=True).count() if total_sections else 0
-        self.progress = round(completed_sections / total_sections * 100, 2) if total_sections else 0
+        # Both counts are denormalized counters: one primary key read, no COUNT queries
+        completed_sections, total_sections = Enrollment.objects.filter(pk=self.pk).values_list(
+            'completed_sections_count', 'course__sections_count'
+        ).get()
+        self.completed_sections_count = completed_sections
+        self.progress = round(min(completed_sections, total_sections) / total_sections * 100, 2) if total_sections else 0
         self.save(update_fields=["progress"])
 
     def check_completion_and_generate_certificate(self):
@@ -268,47 +290,22 @@ class Enrollment(models.Model):
 
         # Sections are fully completed
         if getattr(self.course, 'is_test_required', False):
-            formal_tests = self.course.tests.filter(is_practice=False)
-
-            if formal_tests.exists():
-                # Check if all formal tests have been passed
-                all_tests_passed = all(
-                    TestAttempt.objects.filter(
-                        student=self.student,
-                        test=test,
-                        status='submitted',
-                        total_score__gte=self.PASS_MARK
-                    ).exists()
-                    for test in formal_tests
-                )
-
-                if not all_tests_passed:
-                    self.status = 'completed'
-                    self.save(update_fields=['status'])
-                    return
-
-                # All tests passed → generate certificate if not exists
-                certificate, created = Certificate.objects.get_or_create(enrollment=self)
-                
-                # Generate and save certificate file if not already generated
-                if not certificate.certificate_file:
-                    file_obj = generate_certificate(
-                        student_name=self.student.full_name,
-                        course_name=self.course.title,
-                        issued_at=certificate.issued_at,
-                        certificate_id=certificate.certificate_id
-                    )
-                    certificate.certificate_file.save(
-                        file_obj.name,
-                        file_obj,
-                        save=True
-                    )
+            # Imported here because both modules import this one
+            from main.certificates import issue_certificate
+            from main.services import formal_tests_passed
+
+            # Check if all formal tests have been passed (False when the
+            # course has none, which also just marks it completed)
+            if formal_tests_passed([self])[self.id]:
+                # All tests passed → queue the certificate; it is rendered by
+                # the render_certificates worker, not in this request
+                issue_certificate(self)
 
                 self.status = 'certified'
                 self.save(update_fields=['status'])
 
             else:
-                # Test is required but no formal tests exist → mark completed
+                # Tests not passed yet, or no formal tests exist → mark completed
                 self.status = 'completed'
                 self.save(update_fields=['status'])
         else:
@@ -317,6 +314,13 @@ class Enrollment(models.Model):
             self.save(update_fields=['status'])
             
             
+def adjust_completed_sections(enrollment_id, delta):
+    """Move an enrollment's completed-section counter by ``delta`` in a single UPDATE."""
+    Enrollment.objects.filter(pk=enrollment_id).update(
+        completed_sections_count=Greatest(models.F('completed_sections_count') + delta, 0)
+    )
+
+
 class SectionProgress(models.Model):
     enrollment = models.ForeignKey(
         Enrollment,
@@ -344,6 +348,30 @@ class SectionProgress(models.Model):
         status = "Completed" if self.is_completed else "In Progress"
         return f"{self.enrollment.student.full_name} - {self.section.title} ({status})"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'is_completed' not in update_fields:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            # Same lock as the bulk sync in EnrollmentViewSet.mark_sections_completed,
+            # which counts the rows it completes from a read taken under it
+            Enrollment.objects.select_for_update().filter(pk=self.enrollment_id).exists()
+            if self.pk is None:
+                # (enrollment, section) is unique, so a concurrent second insert fails instead of counting twice
+                super().save(*args, **kwargs)
+                flipped = self.is_completed
+            else:
+                # Flip the stored row only if it still holds the other value: when two
+                # requests complete the same section, the second UPDATE waits for the
+                # first one and then matches nothing, so the flip is counted once
+                flipped = SectionProgress.objects.filter(
+                    pk=self.pk, is_completed=not self.is_completed
+                ).update(is_completed=self.is_completed)
+                super().save(*args, **kwargs)
+            if flipped:
+                adjust_completed_sections(self.enrollment_id, 1 if self.is_completed else -1)
+
     def mark_completed(self):
         self.is_completed = True
         self.completed_at = timezone.now()
@@ -360,12 +388,14 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 import os
-from main.utils import generate_certificate
 
 
 from django.db import models
 from django.utils import timezone
-import uuid
+from django.utils.crypto import get_random_string
+from django.utils.http import int_to_base36
+import re
+import string
 
 class Certificate(models.Model):
     enrollment = models.OneToOneField(
@@ -374,23 +404,69 @@ class Certificate(models.Model):
         related_name="certificate",
         limit_choices_to={"status": "completed"},
     )
-    certificate_id = models.CharField(max_length=12, unique=True, blank=True)  # Shorter ID
-    certificate_file = models.FileField(upload_to="certificates/%Y/%m/%d/")
+    STATUS_PENDING = 'pending'
+    STATUS_READY = 'ready'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_READY, 'Ready'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    # Output format (see main.utils.CERTIFICATE_FORMATS) -> the field holding it
+    FILE_FIELDS = {
+        'png': 'certificate_file',
+        'webp': 'certificate_preview',
+        'pdf': 'certificate_pdf',
+    }
+
+    certificate_id = models.CharField(max_length=32, unique=True, blank=True)
+    # Rendered by `manage.py render_certificates` (see main.certificates), empty while pending
+    certificate_file = models.FileField(upload_to="certificates/%Y/%m/%d/", blank=True)  # png
+    certificate_preview = models.FileField(upload_to="certificates/%Y/%m/%d/", blank=True)  # small webp
+    certificate_pdf = models.FileField(upload_to="certificates/%Y/%m/%d/", blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    # A pending certificate that failed to render is not claimed again before this
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
     issued_at = models.DateTimeField(auto_now_add=True)
+    rendered_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = "certificate"
         ordering = ["-issued_at"]
+        indexes = [
+            # The render queue: pending certificates, oldest first
+            models.Index(fields=['status', 'issued_at'], name='certificate_queue'),
+        ]
 
     def __str__(self):
         return self.certificate_id
 
+    # new_certificate_id()'s format, or the YYMMDD-XXX (3 hex digits) ids issued before it
+    CERTIFICATE_ID_RE = re.compile(r'\d{6}-(?:[0-9A-Z]+-[0-9A-Z]{6}|[0-9A-F]{3})')
+
+    @classmethod
+    def is_well_formed_id(cls, value):
+        """Whether ``value`` could be a certificate id at all, checked without a query."""
+        max_length = cls._meta.get_field('certificate_id').max_length
+        return len(value) <= max_length and cls.CERTIFICATE_ID_RE.fullmatch(value) is not None
+
+    @staticmethod
+    def new_certificate_id(enrollment_id):
+        """
+        Format: YYMMDD-<enrollment id in base 36>-<6 random characters>
+        (e.g., 261018-2F-K7Q9X2). An enrollment has at most one certificate,
+        so the middle part makes ids unique; the random part keeps them
+        from being guessed.
+        """
+        date_str = timezone.now().strftime("%y%m%d")  # 2-digit year + month + day
+        random_chars = get_random_string(6, allowed_chars=string.ascii_uppercase + string.digits)
+        return f"{date_str}-{int_to_base36(enrollment_id).upper()}-{random_chars}"
+
     def save(self, *args, **kwargs):
         if not self.certificate_id:
-            # Format: YYMMDD-XXX (e.g., 240615-A7F)
-            date_str = timezone.now().strftime("%y%m%d")  # 2-digit year + month + day
-            random_chars = uuid.uuid4().hex[:3].upper()   # 3-character random code
-            self.certificate_id = f"{date_str}-{random_chars}"
+            self.certificate_id = self.new_certificate_id(self.enrollment_id)
         super().save(*args, **kwargs)
 
  
@@ -435,43 +511,6 @@ class Attachment(models.Model):
         verbose_name_plural="Attachments"
         ordering=["-created_at"]
 
-from django.core.files import File
-from django.conf import settings
-from django.core.exceptions import ValidationError
-from django.utils import timezone
-import os
-from main.utils import generate_certificate
-
-
-from django.db import models
-from django.utils import timezone
-import uuid
-
-class Certificate(models.Model):
-    enrollment = models.OneToOneField(
-        Enrollment,
-        on_delete=models.CASCADE,
-        related_name="certificate",
-        limit_choices_to={"status": "completed"},
-    )
-    certificate_id = models.CharField(max_length=12, unique=True, blank=True)  # Shorter ID
-    certificate_file = models.FileField(upload_to="certificates/%Y/%m/%d/")
-    issued_at = models.DateTimeField(auto_now_add=True)
-
-    class Meta:
-        db_table = "certificate"
-        ordering = ["-issued_at"]
-
-    def __str__(self):
-        return self.certificate_id
-
-    def save(self, *args, **kwargs):
-        if not self.certificate_id:
-            # Format: YYMMDD-XXX (e.g., 240615-A7F)
-            date_str = timezone.now().strftime("%y%m%d")  # 2-digit year + month + day
-            random_chars = uuid.uuid4().hex[:3].upper()   # 3-character random code
-            self.certificate_id = f"{date_str}-{random_chars}"
-        super().save(*args, **kwargs)
 from django.db import models, transaction
 #review model ,discussion model , reply of the comment model will be fo fututre features, 
   
@@ -544,3 +583,42 @@ class Review(models.Model):
             
             course.save(update_fields=['average_rating', 'total_reviews'])
             
+
+
+# precomputed top-K neighbors per course from two sources: content (TF-IDF)
+# similarity and co-enrollment, both refreshed by the refresh_course_neighbors
+# command; the recommendations endpoint blends them
+class CourseNeighbor(models.Model):
+    SOURCE_CONTENT = 'content'
+    SOURCE_CO_ENROLLMENT = 'co_enrollment'
+    SOURCE_CHOICES = [
+        (SOURCE_CONTENT, 'Content (TF-IDF)'),
+        (SOURCE_CO_ENROLLMENT, 'Co-enrollment'),
+    ]
+
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='neighbors'
+    )
+    neighbor = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default=SOURCE_CONTENT)
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "course_neighbor"
+        verbose_name_plural = "Course Neighbors"
+        ordering = ["course", "source", "rank"]
+        unique_together = ["course", "neighbor", "source"]
+        indexes = [
+            models.Index(fields=['course', 'source', 'rank']),  # top-K lookup per course
+        ]
+
+    def __str__(self):
+        return f"{self.course.title} -> {self.neighbor.title} ({self.score:.3f})"
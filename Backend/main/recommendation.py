@@ -0,0 +1,461 @@
+"""
+Content based course recommendations backed by a persistent TF-IDF index.
+
+The index holds the fitted vectorizer, the (L2 normalised) sparse TF-IDF
+matrix of every published course and a slug -> row map. It is built once
+(see the ``build_recommendation_index`` management command), stored on disk
+with joblib and loaded lazily by each worker, so a recommendation request
+costs a single sparse row product instead of refitting the whole catalog.
+
+Course edits do not refit the model: the signal receivers in main/signals.py
+re-vectorize only the changed courses against the frozen vocabulary and patch
+their rows. Every write of the index file (patches and refits) holds a
+Postgres advisory lock and starts from the file on disk, so concurrent
+edits in different workers apply one after the other instead of
+overwriting each other. The share of out-of-vocabulary tokens seen by those patches is
+tracked as vocabulary drift, and the scheduled
+``build_recommendation_index --if-drifted`` run refits once it passes
+``RECOMMENDER_DRIFT_THRESHOLD``.
+
+The recommendations endpoint reads the top-K neighbors of each course from
+the CourseNeighbor table, which ``refresh_course_neighbors`` fills from this
+index and, as a second collaborative-filtering source, from co-enrollments.
+
+This module imports numpy, scipy and scikit-learn, so views and signals only
+import it inside the functions that need it; workers that never serve a
+recommendation do not pay for those imports at boot.
+"""
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import joblib  # type: ignore
+import numpy as np  # type: ignore
+from scipy import sparse  # type: ignore
+from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
+from django.conf import settings
+
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
+
+from main.models import Course, CourseNeighbor, Enrollment, Review
+from main.stopwords import ENGLISH_STOP_WORDS
+
+logger = logging.getLogger(__name__)
+
+# Course fields that feed the TF-IDF text of a course
+COURSE_FIELDS = (
+    'id', 'slug', 'title', 'keywords', 'category__title',
+    'description', 'level', 'language',
+)
+TEXT_FIELDS = ('title', 'keywords', 'category__title', 'description', 'level', 'language')
+
+SIMILARITY_THRESHOLD = 0.10
+
+# pg_advisory_xact_lock key held while the index file is rewritten
+INDEX_WRITE_LOCK = 0x5245434F
+
+
+def course_text(record):
+    """Combined lower-cased text of a course values() record."""
+    return " ".join(record.get(field) or "" for field in TEXT_FIELDS).lower()
+
+
+def top_k_rows(block, chunk_rows, labels, top_k, threshold):
+    """
+    Yield (label, [(label, score), ...]) for every row of a CSR similarity
+    block, keeping the top_k scores at or above threshold (self excluded).
+    """
+    for offset, row in enumerate(chunk_rows):
+        begin, end = block.indptr[offset], block.indptr[offset + 1]
+        cols, scores = block.indices[begin:end], block.data[begin:end]
+        keep = (scores >= threshold) & (cols != row)
+        cols, scores = cols[keep], scores[keep]
+        if len(scores) > top_k:
+            part = np.argpartition(-scores, top_k)[:top_k]
+            cols, scores = cols[part], scores[part]
+        order = np.lexsort((cols, -scores))
+        yield labels[row], [
+            (labels[col], float(score))
+            for col, score in zip(cols[order], scores[order])
+        ]
+
+
+class RecommendationIndex:
+    def __init__(self, vectorizer, matrix, course_ids, slugs, oov_tokens=0, patched_tokens=0):
+        self.vectorizer = vectorizer
+        self.matrix = sparse.csr_matrix(matrix)
+        self.course_ids = list(course_ids)
+        self.slugs = list(slugs)
+        self._build_maps()
+        # Drift bookkeeping for rows patched since the last fit
+        self.oov_tokens = oov_tokens
+        self.patched_tokens = patched_tokens
+
+    def _build_maps(self):
+        self.slug_to_row = {slug: row for row, slug in enumerate(self.slugs)}
+        self.id_to_row = {course_id: row for row, course_id in enumerate(self.course_ids)}
+
+    @classmethod
+    def build(cls, records=None):
+        """Fit a fresh index over the given records (defaults to published courses)."""
+        if records is None:
+            records = Course.objects.filter(is_published=True).order_by('id').values(*COURSE_FIELDS)
+        records = list(records)
+        if not records:
+            return cls(None, sparse.csr_matrix((0, 0)), [], [])
+
+        vectorizer = TfidfVectorizer(stop_words=ENGLISH_STOP_WORDS, max_features=5000)
+        matrix = vectorizer.fit_transform([course_text(record) for record in records])
+        return cls(
+            vectorizer,
+            matrix,
+            [record['id'] for record in records],
+            [record['slug'] for record in records],
+        )
+
+    @classmethod
+    def load(cls, path):
+        data = joblib.load(path)
+        return cls(
+            data['vectorizer'], data['matrix'], data['course_ids'], data['slugs'],
+            oov_tokens=data.get('oov_tokens', 0),
+            patched_tokens=data.get('patched_tokens', 0),
+        )
+
+    def save(self, path):
+        # Write to a temp file first so other workers never load a partial index
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        joblib.dump(
+            {
+                'vectorizer': self.vectorizer,
+                'matrix': self.matrix,
+                'course_ids': self.course_ids,
+                'slugs': self.slugs,
+                'oov_tokens': self.oov_tokens,
+                'patched_tokens': self.patched_tokens,
+            },
+            tmp_path,
+            compress=3,
+        )
+        os.replace(tmp_path, path)
+
+    def similar(self, course_slug, top_n=4, threshold=SIMILARITY_THRESHOLD):
+        """Return [(course_id, score), ...] most similar to the given course."""
+        row = self.slug_to_row.get(course_slug)
+        if row is None:
+            return []
+
+        # Rows are L2 normalised, so the dot product is the cosine similarity
+        scores = (self.matrix @ self.matrix[row].T).toarray().ravel()
+        scores[row] = 0
+
+        candidates = np.flatnonzero(scores >= threshold)
+        top = candidates[np.argsort(-scores[candidates], kind='stable')[:top_n]]
+        return [(self.course_ids[i], float(scores[i])) for i in top]
+
+    def rank_for_profile(self, weights, top_n=10, threshold=0.0):
+        """
+        Rank indexed courses against a weighted profile of other courses.
+
+        ``weights`` maps course ids (e.g. a student's enrollments) to their
+        weight. The profile vector is the weighted sum of those rows, scored
+        against the catalog with one sparse matrix-vector product; the profile
+        courses themselves are never returned.
+        """
+        rows = [self.id_to_row[course_id] for course_id in weights if course_id in self.id_to_row]
+        if not rows:
+            return []
+
+        row_weights = sparse.csr_matrix(
+            ([weights[self.course_ids[row]] for row in rows], ([0] * len(rows), rows)),
+            shape=(1, self.matrix.shape[0]),
+        )
+        profile = row_weights @ self.matrix
+        norm = np.sqrt(profile.multiply(profile).sum())
+        if not norm:
+            return []
+
+        scores = (self.matrix @ (profile / norm).T).toarray().ravel()
+        scores[rows] = 0
+
+        candidates = np.flatnonzero(scores > threshold)
+        top = candidates[np.argsort(-scores[candidates], kind='stable')[:top_n]]
+        return [(self.course_ids[i], float(scores[i])) for i in top]
+
+    def neighbors(self, rows=None, top_k=10, threshold=SIMILARITY_THRESHOLD, chunk_size=500):
+        """
+        Yield (course_id, [(neighbor_id, score), ...]) for the given rows (all by default).
+
+        Similarities are computed a chunk of rows at a time as one sparse
+        matrix product, so memory stays bounded by chunk_size x catalog.
+        """
+        rows = np.arange(self.matrix.shape[0]) if rows is None else np.asarray(rows, dtype=int)
+        matrix_t = self.matrix.T.tocsc()
+
+        for start in range(0, len(rows), chunk_size):
+            chunk_rows = rows[start:start + chunk_size]
+            block = (self.matrix[chunk_rows] @ matrix_t).tocsr()
+            yield from top_k_rows(block, chunk_rows, self.course_ids, top_k, threshold)
+
+    @property
+    def drift(self):
+        """Share of patched tokens that fell outside the frozen vocabulary."""
+        if not self.patched_tokens:
+            return 0.0
+        return self.oov_tokens / self.patched_tokens
+
+    @property
+    def needs_refit(self):
+        return self.vectorizer is None or self.drift > settings.RECOMMENDER_DRIFT_THRESHOLD
+
+    def upsert(self, record):
+        """Re-vectorize one course with the frozen vocabulary and patch (or append) its row."""
+        if self.vectorizer is None:
+            # Nothing fitted yet, so there is no vocabulary to patch against
+            return False
+
+        text = course_text(record)
+        tokens = self.vectorizer.build_analyzer()(text)
+        vocabulary = self.vectorizer.vocabulary_
+        self.oov_tokens += sum(1 for token in tokens if token not in vocabulary)
+        self.patched_tokens += len(tokens)
+
+        vector = self.vectorizer.transform([text])
+        row = self.id_to_row.get(record['id'])
+        if row is None:
+            self.matrix = sparse.vstack([self.matrix, vector], format='csr')
+            self.course_ids = self.course_ids + [record['id']]
+            self.slugs = self.slugs + [record['slug']]
+        else:
+            self.matrix = sparse.vstack(
+                [self.matrix[:row], vector, self.matrix[row + 1:]], format='csr'
+            )
+            self.slugs = self.slugs[:row] + [record['slug']] + self.slugs[row + 1:]
+        self._build_maps()
+        return True
+
+    def remove(self, course_id):
+        """Drop a course (deleted or unpublished) from the index."""
+        row = self.id_to_row.get(course_id)
+        if row is None:
+            return False
+        self.matrix = sparse.vstack([self.matrix[:row], self.matrix[row + 1:]], format='csr')
+        self.course_ids = self.course_ids[:row] + self.course_ids[row + 1:]
+        self.slugs = self.slugs[:row] + self.slugs[row + 1:]
+        self._build_maps()
+        return True
+
+
+_index = None
+_index_mtime = None
+_index_lock = threading.RLock()
+
+
+def index_path():
+    return settings.RECOMMENDER_INDEX_PATH
+
+
+@contextmanager
+def index_write_lock():
+    """
+    Serialize writes of the index file across processes. The lock is held
+    until the surrounding transaction ends.
+    """
+    with _index_lock, transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [INDEX_WRITE_LOCK])
+        yield
+
+
+def rebuild_index():
+    """Fit the index from the database and persist it."""
+    with index_write_lock():
+        index = RecommendationIndex.build()
+        index.save(index_path())
+    return index
+
+
+def get_index():
+    """
+    Return this worker's copy of the index, loading it on first use and
+    reloading it whenever the file on disk has been replaced.
+    """
+    global _index, _index_mtime
+    path = index_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+
+    if _index is not None and mtime is not None and mtime == _index_mtime:
+        return _index
+
+    with _index_lock:
+        if _index is None or mtime is None or mtime != _index_mtime:
+            if mtime is None:
+                logger.info("Recommendation index not found at %s, building it", path)
+                _index = rebuild_index()
+                mtime = os.path.getmtime(path)
+            else:
+                _index = RecommendationIndex.load(path)
+            _index_mtime = mtime
+    return _index
+
+
+def enrollment_weight(progress, rating=None):
+    """
+    Weight of an enrolled course in a student's profile: courses the student
+    got further into count more, and a review scales it by the rating
+    (3 stars is neutral).
+    """
+    weight = 0.5 + (progress or 0) / 100
+    if rating:
+        weight *= rating / 3
+    return weight
+
+
+def write_neighbors(source, neighbor_lists, course_ids=None):
+    """
+    Replace the stored neighbors of one source with
+    ``neighbor_lists`` ((course_id, [(neighbor_id, score), ...]) pairs),
+    either for the given courses or for the whole table.
+    Returns the number of neighbor rows written.
+    """
+    stale = CourseNeighbor.objects.filter(source=source)
+    if course_ids is not None:
+        stale = stale.filter(course_id__in=course_ids)
+
+    written = 0
+    with transaction.atomic():
+        stale.delete()
+        batch = []
+        for course_id, hits in neighbor_lists:
+            batch.extend(
+                CourseNeighbor(
+                    course_id=course_id, neighbor_id=neighbor_id,
+                    source=source, score=score, rank=rank,
+                )
+                for rank, (neighbor_id, score) in enumerate(hits, start=1)
+            )
+            if len(batch) >= 5000:
+                CourseNeighbor.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        CourseNeighbor.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+def store_neighbors(index, course_ids=None, top_k=None, chunk_size=500):
+    """
+    Recompute the content (TF-IDF) top-K neighbors of the given courses (all
+    indexed courses by default) and replace them in the CourseNeighbor table.
+    """
+    top_k = top_k or settings.RECOMMENDER_NEIGHBORS_K
+    rows = None
+    if course_ids is not None:
+        rows = [index.id_to_row[course_id] for course_id in course_ids if course_id in index.id_to_row]
+    return write_neighbors(
+        CourseNeighbor.SOURCE_CONTENT,
+        index.neighbors(rows, top_k=top_k, chunk_size=chunk_size),
+        course_ids,
+    )
+
+
+def co_enrollment_neighbors(top_k=None, chunk_size=500, min_support=2):
+    """
+    Item-item collaborative filtering from co-enrollment.
+
+    Builds a sparse students x courses matrix weighted like the "for you"
+    profile (progress and rating), L2-normalises the course columns and
+    yields each published course's top-K neighbors by cosine similarity.
+    Pairs shared by fewer than ``min_support`` students are ignored.
+    """
+    top_k = top_k or settings.RECOMMENDER_NEIGHBORS_K
+    enrollments = Enrollment.objects.filter(course__is_published=True).annotate(
+        rating=Subquery(
+            Review.objects.filter(
+                student=OuterRef('student'), course=OuterRef('course')
+            ).values('rating')[:1]
+        )
+    ).values_list('student_id', 'course_id', 'progress', 'rating')
+
+    student_cols, course_cols, weights = {}, {}, []
+    student_idx, course_idx = [], []
+    for student_id, course_id, progress, rating in enrollments.iterator(chunk_size=5000):
+        student_idx.append(student_cols.setdefault(student_id, len(student_cols)))
+        course_idx.append(course_cols.setdefault(course_id, len(course_cols)))
+        weights.append(enrollment_weight(progress, rating))
+    if not weights:
+        return
+
+    shape = (len(student_cols), len(course_cols))
+    ratings = sparse.csc_matrix((weights, (student_idx, course_idx)), shape=shape)
+    enrolled = sparse.csc_matrix((np.ones(len(weights)), (student_idx, course_idx)), shape=shape)
+    norms = np.sqrt(np.asarray(ratings.multiply(ratings).sum(axis=0))).ravel()
+    normalized = (ratings @ sparse.diags(1 / norms)).tocsc()
+
+    course_ids = list(course_cols)
+    normalized_t, enrolled_t = normalized.T.tocsr(), enrolled.T.tocsr()
+    for start in range(0, len(course_ids), chunk_size):
+        chunk_rows = np.arange(start, min(start + chunk_size, len(course_ids)))
+        scores = normalized_t[chunk_rows] @ normalized
+        support = enrolled_t[chunk_rows] @ enrolled
+        block = scores.multiply(support >= min_support).tocsr()
+        block.eliminate_zeros()
+        yield from top_k_rows(block, chunk_rows, course_ids, top_k, threshold=1e-9)
+
+
+def store_co_enrollment_neighbors(top_k=None, chunk_size=500):
+    """Recompute the whole co-enrollment neighbor table."""
+    return write_neighbors(
+        CourseNeighbor.SOURCE_CO_ENROLLMENT,
+        co_enrollment_neighbors(top_k=top_k, chunk_size=chunk_size),
+    )
+
+
+def refresh_courses(course_ids):
+    """
+    Patch the stored index for the given courses without refitting it.
+
+    Published courses are re-vectorized and upserted, everything else is
+    removed. Does nothing until an index has been built.
+    """
+    global _index, _index_mtime
+    path = index_path()
+    if not course_ids or not os.path.exists(path):
+        return
+
+    with index_write_lock():
+        # Patch the file as it is now, not this worker's copy: another worker
+        # may have written it since. Readers keep the old object until the swap.
+        index = RecommendationIndex.load(path)
+        records = {
+            record['id']: record
+            for record in Course.objects.filter(
+                id__in=course_ids, is_published=True
+            ).values(*COURSE_FIELDS)
+        }
+        changed = False
+        for course_id in course_ids:
+            if course_id in records:
+                changed = index.upsert(records[course_id]) or changed
+            else:
+                changed = index.remove(course_id) or changed
+
+        if changed:
+            index.save(path)
+            _index, _index_mtime = index, os.path.getmtime(path)
+            # Keep the edited courses' own neighbor lists current, the
+            # scheduled refresh_course_neighbors run updates everyone else's
+            store_neighbors(index, course_ids)
+            if index.needs_refit:
+                logger.info(
+                    "Recommendation index vocabulary drift is %.2f, next scheduled run will refit it",
+                    index.drift,
+                )
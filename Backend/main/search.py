@@ -0,0 +1,309 @@
+"""
+Course search for CourseSearchView.
+
+Queries are ranked by full-text search on the stored ``Course.search_vector``
+column, topped up by trigram similarity when too few courses match (typos).
+Ranking only ever returns a capped list of ids; the page being served is
+hydrated separately, so a response costs the same however large the catalog.
+The ranked ids are cached per normalized query, audience and facet filters
+(not sort: ranking ignores it) until the catalog version moves (see
+main.caching).
+
+Facet counts (level, language, category, price range) come from one grouped
+query over everything the query matches, ignoring the selected filters: every
+full-text match (not just the capped ranked list) plus any typo-fallback hits. That
+table is cached per query, and each facet's counts are summed from it with
+the other facets' filters applied, so picking a level still shows how many
+courses every other level would give.
+"""
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q, ExpressionWrapper, FloatField, Case, When, IntegerField, CharField, Count, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.utils.urls import remove_query_param
+
+from .autocomplete import normalize
+from .caching import search_key
+
+# Below this many full-text hits the trigram typo fallback tops up the results
+MIN_FULL_TEXT_HITS = 5
+
+# Trigram fallback scoring: minimum score for short (< 6 chars) and longer
+# queries, and the weight of each signal. Tune with `manage.py bench_search`.
+TRIGRAM_THRESHOLDS = (0.05, 0.15)
+TRIGRAM_WEIGHTS = {
+    'title': 0.7,
+    'keywords': 0.3,
+    'exact_title': 0.5,
+    'exact_keyword': 0.2,
+}
+
+# Orderings for browsing without a query. Each ends in id, so the whole
+# ordering is unique; browse cursors carry every field of it (keyset pagination)
+BROWSE_ORDERINGS = {
+    'price_asc': ('price', 'id'),
+    'price_desc': ('-price', '-id'),
+}
+DEFAULT_BROWSE_ORDERING = ('-created_at', '-id')
+
+# Price range facet buckets (prices are in Rs)
+PRICE_RANGES = {
+    'free': Q(price=0),
+    'under_1000': Q(price__gt=0, price__lt=1000),
+    '1000_to_5000': Q(price__gte=1000, price__lt=5000),
+    'over_5000': Q(price__gte=5000),
+}
+
+# Facet name (also its query parameter) -> the Course lookup it filters on
+FACET_LOOKUPS = {
+    'level': 'level',
+    'language': 'language',
+    'category': 'category__slug',
+}
+FACETS = [*FACET_LOOKUPS, 'price']
+
+
+def full_text_query(query):
+    return SearchQuery(query, config='english', search_type='websearch')
+
+
+def ranked_course_ids(courses, query, limit=None):
+    """
+    Return the ids of ``courses`` matching ``query``, best first, at most
+    ``limit`` (SEARCH_MAX_CANDIDATES by default) of them.
+    """
+    limit = limit or settings.SEARCH_MAX_CANDIDATES
+
+    # Weighted full-text search on the stored search_vector (GIN indexed):
+    # title > keywords > category > description
+    search_query = full_text_query(query)
+    ids = list(
+        courses.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F('search_vector'), search_query))
+        .order_by('-rank', '-created_at')
+        .values_list('id', flat=True)[:limit]
+    )
+    if len(ids) >= MIN_FULL_TEXT_HITS:
+        return ids
+
+    # Trigram similarity is only the typo fallback ("pyhton", "djnago")
+    threshold = TRIGRAM_THRESHOLDS[0] if len(query) < 6 else TRIGRAM_THRESHOLDS[1]
+    fallback = courses.exclude(id__in=ids).annotate(
+        similarity_title=TrigramSimilarity('title', query),
+        similarity_keywords=TrigramSimilarity('keywords', query),
+        exact_title_match=Case(
+            When(title__iexact=query, then=1),
+            default=0,
+            output_field=IntegerField()
+        ),
+        exact_keyword_match=Case(
+            When(keywords__icontains=query, then=1),
+            default=0,
+            output_field=IntegerField()
+        )
+    ).annotate(
+        total_similarity=ExpressionWrapper(
+            (F('similarity_title') * TRIGRAM_WEIGHTS['title'] +
+             F('similarity_keywords') * TRIGRAM_WEIGHTS['keywords']) +
+            (F('exact_title_match') * TRIGRAM_WEIGHTS['exact_title']) +
+            (F('exact_keyword_match') * TRIGRAM_WEIGHTS['exact_keyword']),
+            output_field=FloatField()
+        )
+    ).filter(
+        Q(total_similarity__gt=threshold) |
+        Q(title__icontains=query) |
+        Q(keywords__icontains=query)
+    ).order_by('-total_similarity')
+    return ids + list(fallback.values_list('id', flat=True)[:limit - len(ids)])
+
+
+def cached_ranked_course_ids(courses, query, audience='public', filters=None):
+    """
+    ranked_course_ids() through the cache. ``audience`` names the visibility
+    ``courses`` was filtered to, so admins and students never share entries,
+    and ``filters`` are the selected facets, applied before ranking.
+    """
+    query = normalize(query)
+    filters = filters or {}
+    key = search_key('ids', query, audience, sorted(filters.items()))
+    ids = cache.get(key)
+    if ids is None:
+        ids = ranked_course_ids(filter_courses(courses, filters), query)
+        cache.set(key, ids, settings.SEARCH_CACHE_TTL)
+    return ids
+
+
+def selected_filters(params):
+    """The facet filters present in the request's query parameters."""
+    return {facet: params[facet] for facet in FACETS if params.get(facet)}
+
+
+def filter_courses(courses, filters):
+    for facet, lookup in FACET_LOOKUPS.items():
+        if facet in filters:
+            courses = courses.filter(**{lookup: filters[facet]})
+    if 'price' in filters:
+        if filters['price'] not in PRICE_RANGES:
+            return courses.none()
+        courses = courses.filter(PRICE_RANGES[filters['price']])
+    return courses
+
+
+def facet_table(courses):
+    """One grouped query: course counts per level/language/category/price range combination."""
+    price_range = Case(
+        *[When(condition, then=Value(name)) for name, condition in PRICE_RANGES.items()],
+        output_field=CharField(),
+    )
+    return list(
+        courses.order_by()
+        .values('level', 'language', 'category__slug', 'category__title', price_range=price_range)
+        .annotate(count=Count('id'))
+    )
+
+
+def cached_facet_table(courses, query='', audience='public'):
+    """
+    facet_table() of what ``query`` matches (the whole of ``courses`` when
+    browsing), cached like the ranked ids. Counts cover every full-text
+    match, beyond the SEARCH_MAX_CANDIDATES the ranking stops at; typo
+    fallback hits only exist in the ranked list, so those are capped.
+    """
+    query = normalize(query)
+    key = search_key('facets', query, audience)
+    table = cache.get(key)
+    if table is None:
+        if query:
+            ranked_ids = cached_ranked_course_ids(courses, query, audience=audience)
+            courses = courses.filter(Q(search_vector=full_text_query(query)) | Q(id__in=ranked_ids))
+        table = facet_table(courses)
+        cache.set(key, table, settings.SEARCH_CACHE_TTL)
+    return table
+
+
+def facet_counts(table, filters):
+    """
+    Per facet, the value counts among rows matching every *other* selected
+    filter, most common first.
+    """
+    columns = {**FACET_LOOKUPS, 'price': 'price_range'}
+    facets = {}
+    for facet in FACETS:
+        counts, labels = {}, {}
+        for row in table:
+            if any(row[columns[other]] != value for other, value in filters.items() if other != facet):
+                continue
+            value = row[columns[facet]]
+            if value is None:
+                continue
+            counts[value] = counts.get(value, 0) + row['count']
+            if facet == 'category':
+                labels[value] = row['category__title']
+        facets[facet] = [
+            {'value': value, 'count': count, **({'label': labels[value]} if facet == 'category' else {})}
+            for value, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        ]
+    return facets
+
+
+def keyset_filter(ordering, values):
+    """Q for the rows after ``values`` in ``ordering``: (a, b) > (x, y) as a > x OR (a = x AND b > y)."""
+    condition, equal = Q(), Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+class SearchCursorPagination(CursorPagination):
+    """
+    Cursor pagination for browsing the catalog; ``?page_size=`` is capped.
+
+    DRF's CursorPagination positions on the first ordering field alone and
+    falls back to offsets on ties, which breaks down on many courses with
+    the same price. Here the cursor position holds every ordering field, so
+    pages are an indexable "rows after this key" filter whatever the ties.
+    """
+    page_size = settings.SEARCH_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.SEARCH_MAX_PAGE_SIZE
+    ordering = DEFAULT_BROWSE_ORDERING
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+
+        # Walking backwards (a "previous" cursor) reads the flipped ordering
+        ordering = self.ordering = self.get_ordering(request, queryset, view)
+        if reverse:
+            ordering = tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor and self.cursor.position is not None:
+            try:
+                values = json.loads(self.cursor.position)
+            except ValueError:
+                raise NotFound(self.invalid_cursor_message)
+            queryset = queryset.filter(keyset_filter(ordering, values))
+
+        rows = list(queryset[:self.page_size + 1])
+        more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if reverse:
+            self.page.reverse()
+        self.has_next = True if reverse else more
+        self.has_previous = more if reverse else self.cursor is not None
+        return self.page
+
+    def position(self, instance):
+        return json.dumps([str(getattr(instance, field.lstrip('-'))) for field in self.ordering])
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.position(self.page[0])))
+
+
+class RankedCursorPagination(SearchCursorPagination):
+    """
+    Cursor pagination over an already ranked list of ids. The cursor is the
+    same opaque token as SearchCursorPagination's, carrying an offset into
+    the list.
+    """
+
+    def paginate_ids(self, ids, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        self.offset = cursor.offset if cursor else 0
+        self.total = len(ids)
+        return ids[self.offset:self.offset + self.page_size]
+
+    def get_next_link(self):
+        if self.offset + self.page_size >= self.total:
+            return None
+        return self.encode_cursor(Cursor(offset=self.offset + self.page_size, reverse=False, position=None))
+
+    def get_previous_link(self):
+        if self.offset <= 0:
+            return None
+        if self.offset <= self.page_size:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(Cursor(offset=self.offset - self.page_size, reverse=False, position=None))
@@ -97,10 +97,14 @@ class CourseSerializer(serializers.ModelSerializer):
         ]
         
     def get_sections(self, obj):
+        # served from the sections__attachments prefetch of CourseViewSet
         sections=obj.sections.all()
         return SectionSerializer(sections,many=True).data
     
     def get_total_enrolled(self,obj):
+        # annotated by CourseViewSet.get_queryset, counted here for other callers
+        if hasattr(obj, 'enrolled_count'):
+            return obj.enrolled_count
         return obj.get_total_students()
 
 class CourseListSerializer(serializers.ModelSerializer):
@@ -262,6 +266,12 @@ class SectionProgressSerializer(serializers.ModelSerializer):
 
 
 
+class SectionCompletionSerializer(serializers.Serializer):
+    """One entry of a bulk section-completion sync: the section and when it was completed offline."""
+    id = serializers.IntegerField()
+    completed_at = serializers.DateTimeField(required=False)
+
+
 class SectionWithCompletionSerializer(serializers.ModelSerializer):
     is_completed = serializers.SerializerMethodField()
     video_url = serializers.SerializerMethodField()
@@ -285,6 +295,11 @@ class SectionWithCompletionSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
         
     def get_is_completed(self, obj):
+        # EnrollmentViewSet.retrieve loads the enrollment's completed sections once
+        completed_section_ids = self.context.get('completed_section_ids')
+        if completed_section_ids is not None:
+            return obj.id in completed_section_ids
+
         user = self.context['request'].user
         try:
             enrollment = obj.course.enrollments.get(student=user)
@@ -330,6 +345,7 @@ from .models import Enrollment, SectionProgress, Certificate
 from users.serializers import UserAccountListSerializer
 from main.serializers import CourseListSerializer, CourseNestedSerializer
 from smarttest.models import TestAttempt
+from main.services import formal_tests_passed
 
 class EnrollmentSerializer(serializers.ModelSerializer):
     course = CourseListSerializer(read_only=True)
@@ -389,27 +405,20 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         ]
 
     def get_is_sections_completed(self, obj):
-        total_sections = obj.course.sections.count()
+        # denormalized counters, no COUNT queries
+        total_sections = obj.course.sections_count
         if total_sections == 0:
             return False
-        completed_sections = obj.section_progresses.filter(is_completed=True).count()
-        return completed_sections == total_sections
+        return obj.completed_sections_count >= total_sections
 
     def get_is_test_passed(self, obj):
         if hasattr(obj.course, "is_test_required") and not obj.course.is_test_required:
             return True
-        formal_tests = obj.course.tests.filter(is_practice=False)
-        if not formal_tests.exists():
-            return False
-        return all(
-            TestAttempt.objects.filter(
-                student=obj.student,
-                test=test,
-                status="submitted",
-                total_score__gte=obj.PASS_MARK
-            ).exists()
-            for test in formal_tests
-        )
+        # EnrollmentViewSet evaluates the whole page of enrollments in one query
+        passed = self.context.get('formal_tests_passed')
+        if passed is None or obj.id not in passed:
+            passed = formal_tests_passed([obj])
+        return passed[obj.id]
 
 
 class EnrolledCourseDetailSerializer(serializers.ModelSerializer):
@@ -451,27 +460,20 @@ class EnrolledCourseDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_is_sections_completed(self, obj):
-        total_sections = obj.course.sections.count()
+        # denormalized counters, no COUNT queries
+        total_sections = obj.course.sections_count
         if total_sections == 0:
             return False
-        completed_sections = obj.section_progresses.filter(is_completed=True).count()
-        return completed_sections == total_sections
+        return obj.completed_sections_count >= total_sections
 
     def get_is_test_passed(self, obj):
         if hasattr(obj.course, "is_test_required") and not obj.course.is_test_required:
             return True
-        formal_tests = obj.course.tests.filter(is_practice=False)
-        if not formal_tests.exists():
-            return False
-        return all(
-            TestAttempt.objects.filter(
-                student=obj.student,
-                test=test,
-                status="submitted",
-                total_score__gte=obj.PASS_MARK
-            ).exists()
-            for test in formal_tests
-        )
+        # EnrollmentViewSet evaluates the whole page of enrollments in one query
+        passed = self.context.get('formal_tests_passed')
+        if passed is None or obj.id not in passed:
+            passed = formal_tests_passed([obj])
+        return passed[obj.id]
 
     
 class AttachmentSerializer(serializers.ModelSerializer):
@@ -534,48 +536,44 @@ from django.core.files import File
 from rest_framework import serializers
 from django.utils import timezone
 from .models import Certificate
-from .utils import generate_certificate  # returns Django File object
+from .certificates import issue_certificate
 
 
 class CertificateSerializer(serializers.ModelSerializer):
     course_slug = serializers.CharField(source='enrollment.course.slug', read_only=True)
     certificate_file_url = serializers.SerializerMethodField()  # Dynamic full URL
+    certificate_preview_url = serializers.SerializerMethodField()
+    certificate_pdf_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Certificate
-        fields = ['certificate_id', 'certificate_file', 'certificate_file_url', 'issued_at', 'course_slug']
-        read_only_fields = ['certificate_id', 'issued_at', 'course_slug', 'certificate_file_url']
+        fields = [
+            'certificate_id', 'status', 'certificate_file', 'certificate_file_url',
+            'certificate_preview_url', 'certificate_pdf_url', 'issued_at', 'course_slug',
+        ]
+        read_only_fields = [
+            'certificate_id', 'status', 'issued_at', 'course_slug', 'certificate_file_url',
+            'certificate_preview_url', 'certificate_pdf_url',
+        ]
 
-    def get_certificate_file_url(self, obj):
+    def _absolute_url(self, file):
         request = self.context.get('request')
-        if obj.certificate_file:
-            return request.build_absolute_uri(obj.certificate_file.url)
+        if file:
+            return request.build_absolute_uri(file.url)
         return None
 
+    def get_certificate_file_url(self, obj):
+        return self._absolute_url(obj.certificate_file)
+
+    def get_certificate_preview_url(self, obj):
+        return self._absolute_url(obj.certificate_preview)
+
+    def get_certificate_pdf_url(self, obj):
+        return self._absolute_url(obj.certificate_pdf)
+
     def create(self, validated_data):
-        enrollment = validated_data['enrollment']
-        student_name = enrollment.student.full_name
-        course_title = enrollment.course.title
-
-        # Step 1: Create certificate instance (generates certificate_id)
-        certificate = Certificate.objects.create(enrollment=enrollment)
-
-        # Step 2: Generate the certificate file (returns Django File object)
-        certificate_file = generate_certificate(
-            student_name=student_name,
-            course_name=course_title,
-            issued_at=timezone.now(),
-            certificate_id=certificate.certificate_id
-        )
-
-        # Step 3: Save File object directly to FileField
-        certificate.certificate_file.save(
-            certificate_file.name,
-            certificate_file,
-            save=True
-        )
-
-        return certificate
+        # The file is rendered by the render_certificates worker
+        return issue_certificate(validated_data['enrollment'])
 
 
 # class CertificateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,85 @@
+"""
+Enrollment rules shared by the serializers, the views, the signals and
+Enrollment.check_completion_and_generate_certificate, written to work on a
+batch of enrollments (or a whole course) at once.
+"""
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Greatest, Least, Round
+
+from smarttest.models import Test, TestAttempt
+
+from .models import Course, Enrollment
+
+
+def formal_tests_passed(enrollments):
+    """
+    Map each enrollment's id to whether its student has passed every formal
+    (non-practice) test of its course. A course without formal tests counts
+    as not passed, as before.
+
+    One grouped query: passing submissions per (student, course), next to
+    the number of formal tests the course has.
+    """
+    enrollments = list(enrollments)
+    if not enrollments:
+        return {}
+
+    required = (
+        Test.objects.filter(course=OuterRef('test__course'), is_practice=False)
+        .order_by()
+        .values('course')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    rows = (
+        TestAttempt.objects.filter(
+            student_id__in={enrollment.student_id for enrollment in enrollments},
+            test__course_id__in={enrollment.course_id for enrollment in enrollments},
+            test__is_practice=False,
+            status='submitted',
+            total_score__gte=Enrollment.PASS_MARK,
+        )
+        .order_by()
+        .values('student_id', 'test__course_id')
+        .annotate(
+            passed=Count('test', distinct=True),
+            required=Subquery(required, output_field=IntegerField()),
+        )
+    )
+    passed = {
+        (row['student_id'], row['test__course_id'])
+        for row in rows
+        if row['required'] and row['passed'] >= row['required']
+    }
+    return {
+        enrollment.id: (enrollment.student_id, enrollment.course_id) in passed
+        for enrollment in enrollments
+    }
+
+
+def adjust_course_sections(course_id, delta):
+    """
+    Move a course's section counter by ``delta`` and rescale the stored
+    progress of all its enrollments to the new total: two UPDATEs and a
+    primary key read, however many students are enrolled.
+
+    Statuses follow the new progress: completed enrollments that fell below
+    100 (a section was added) go back to in_progress in one more UPDATE, and
+    the ones that reached 100 (the last unfinished section was deleted) go
+    through check_completion_and_generate_certificate, which may queue their
+    certificate. Certified enrollments keep their issued certificate.
+    """
+    Course.objects.filter(pk=course_id).update(sections_count=Greatest(F('sections_count') + delta, 0))
+    total = Course.objects.filter(pk=course_id).values_list('sections_count', flat=True).first()
+
+    enrollments = Enrollment.objects.filter(course_id=course_id)
+    if not total:
+        enrollments.update(progress=0)
+    else:
+        percent = Least(F('completed_sections_count'), total) * Value(100.0) / Value(float(total))
+        enrollments.update(progress=Round(Cast(percent, DecimalField(max_digits=9, decimal_places=4)), 2))
+
+    enrollments.filter(status='completed', progress__lt=100).update(status='in_progress')
+    finished = enrollments.filter(progress__gte=100, status='in_progress').select_related('course')
+    for enrollment in finished:
+        enrollment.check_completion_and_generate_certificate()
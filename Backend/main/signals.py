@@ -1,8 +1,24 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import Review, Course
+from .models import Review, Course, Category, Certificate, Enrollment, Section, SectionProgress, adjust_completed_sections
 from django.db import transaction
 from django.db import models
+import logging
+
+from users.models import UserAccount
+
+from .caching import bump_catalog_version, invalidate_certificates, invalidate_for_you
+from .services import adjust_course_sections
+
+logger = logging.getLogger(__name__)
+
+# Course fields that change the recommendation text or visibility of a course
+RECOMMENDATION_FIELDS = {
+    'title', 'slug', 'keywords', 'description', 'level', 'language', 'category', 'is_published',
+}
+
+# Course fields that search results and typeahead suggestions depend on
+CATALOG_FIELDS = RECOMMENDATION_FIELDS | {'price'}
 
 @receiver(post_delete, sender=Review)
 def update_course_on_review_delete(sender, instance, **kwargs):
@@ -13,4 +29,106 @@ def update_course_on_review_delete(sender, instance, **kwargs):
         course.average_rating = round(avg, 2)
         # Update total_reviews
         course.total_reviews = course.reviews.count()
-        course.save(update_fields=['average_rating', 'total_reviews'])
\ No newline at end of file
+        course.save(update_fields=['average_rating', 'total_reviews'])
+
+
+def _refresh_recommendations_on_commit(course_ids):
+    def refresh():
+        try:
+            # Imported lazily so workers do not load scikit-learn at boot
+            from .recommendation import refresh_courses
+            refresh_courses(course_ids)
+        except Exception:
+            # Never fail an admin edit because of the recommender, the scheduled refit repairs it
+            logger.exception("Could not patch recommendation index for courses %s", course_ids)
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=Course)
+def patch_recommendation_index_on_course_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Stat-only saves (ratings, review counts) do not touch the recommendation text
+    if raw or (update_fields and not RECOMMENDATION_FIELDS.intersection(update_fields)):
+        return
+    _refresh_recommendations_on_commit([instance.id])
+
+
+@receiver(post_delete, sender=Course)
+def patch_recommendation_index_on_course_delete(sender, instance, **kwargs):
+    _refresh_recommendations_on_commit([instance.id])
+
+
+@receiver(post_save, sender=Category)
+def patch_recommendation_index_on_category_save(sender, instance, created=False, raw=False, **kwargs):
+    # The category title is part of every course text in that category
+    if raw or created:
+        return
+    course_ids = list(instance.courses.filter(is_published=True).values_list('id', flat=True))
+    _refresh_recommendations_on_commit(course_ids)
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_for_you_recommendations(sender, instance, **kwargs):
+    # Enrollments (and their progress) and ratings make up the student's profile
+    invalidate_for_you(instance.student_id)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=Category)
+def bump_catalog_version_on_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Rating and enrollment counters do not change what search or typeahead return
+    if raw or (update_fields and not CATALOG_FIELDS.intersection(update_fields)):
+        return
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Section)
+def count_course_section_on_create(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        adjust_course_sections(instance.course_id, 1)
+
+
+@receiver(post_delete, sender=Section)
+def count_course_section_on_delete(sender, instance, **kwargs):
+    # Runs after the section's progress rows were deleted (and uncounted) below
+    adjust_course_sections(instance.course_id, -1)
+
+
+@receiver(post_delete, sender=SectionProgress)
+def count_completed_section_on_delete(sender, instance, **kwargs):
+    if instance.is_completed:
+        adjust_completed_sections(instance.enrollment_id, -1)
+
+
+def _invalidate_certificates_on_commit(certificates):
+    certificate_ids = list(certificates.values_list('certificate_id', flat=True))
+    if certificate_ids:
+        transaction.on_commit(lambda: invalidate_certificates(certificate_ids))
+
+
+@receiver(post_save, sender=Certificate)
+@receiver(post_delete, sender=Certificate)
+def invalidate_certificate_verification(sender, instance, **kwargs):
+    # Also drops a cached "not found" for a newly issued id
+    certificate_id = instance.certificate_id
+    transaction.on_commit(lambda: invalidate_certificates([certificate_id]))
+
+
+@receiver(post_save, sender=Course)
+def invalidate_course_certificates(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # Verification shows the course title
+    if raw or created or (update_fields and 'title' not in update_fields):
+        return
+    _invalidate_certificates_on_commit(Certificate.objects.filter(enrollment__course=instance))
+
+
+@receiver(post_save, sender=UserAccount)
+def invalidate_student_certificates(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # Verification shows the student's name; logins only touch last_login
+    if raw or created or (update_fields and 'full_name' not in update_fields):
+        return
+    _invalidate_certificates_on_commit(Certificate.objects.filter(enrollment__student=instance))
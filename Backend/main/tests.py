@@ -1,3 +1,635 @@
-from django.test import TestCase
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from smarttest.models import Test, TestAttempt
+from users.models import UserAccount
+
+from main.autocomplete import AutocompleteIndex, get_autocomplete_index
+from main.certificates import content_addressed_name, render_next_certificate
+from main.models import Category, Certificate, Course, Enrollment, Section, SectionProgress
+from main.recommendation import RecommendationIndex
+from main.search import RankedCursorPagination, facet_counts
+from main.services import formal_tests_passed
+from main.utils import generate_certificate, generate_certificate_files, get_certificate_assets
+
+
+def course_record(course_id, slug, title, keywords="", category="Programming", description=""):
+    return {
+        'id': course_id,
+        'slug': slug,
+        'title': title,
+        'keywords': keywords,
+        'category__title': category,
+        'description': description,
+        'level': 'beginner',
+        'language': 'english',
+    }
+
+
+CATALOG = [
+    course_record(1, 'python-basics', 'Python Basics', 'python, programming', description="Learn python syntax"),
+    course_record(2, 'advanced-python', 'Advanced Python', 'python, decorators', description="Python generators and decorators"),
+    course_record(3, 'django-web', 'Django Web Development', 'django, python, web', description="Build web apps with django"),
+    course_record(4, 'watercolor', 'Watercolor Painting', 'art, painting', category="Art", description="Brushes and paper"),
+]
+
+
+class RecommendationIndexTest(SimpleTestCase):
+    def test_similar_courses_are_ranked_and_exclude_itself(self):
+        index = RecommendationIndex.build(CATALOG)
+        hits = index.similar('python-basics', top_n=4)
+
+        ids = [course_id for course_id, _ in hits]
+        self.assertNotIn(1, ids)
+        self.assertNotIn(4, ids)
+        self.assertEqual(ids[0], 2)
+        scores = [score for _, score in hits]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_unknown_slug_and_empty_catalog(self):
+        self.assertEqual(RecommendationIndex.build(CATALOG).similar('missing'), [])
+        self.assertEqual(RecommendationIndex.build([]).similar('python-basics'), [])
+
+    def test_save_and_load_round_trip(self):
+        index = RecommendationIndex.build(CATALOG)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'index', 'courses.joblib')
+            index.save(path)
+            loaded = RecommendationIndex.load(path)
+
+        self.assertEqual(loaded.slugs, index.slugs)
+        self.assertEqual(loaded.similar('django-web'), index.similar('django-web'))
+
+    def test_upsert_and_remove_patch_rows_without_refit(self):
+        index = RecommendationIndex.build(CATALOG)
+        vocabulary = dict(index.vectorizer.vocabulary_)
+
+        index.upsert(course_record(
+            5, 'flask-web', 'Flask Web Development', 'flask, python, web', description="Build web apps with flask"
+        ))
+        self.assertEqual(index.matrix.shape[0], 5)
+        self.assertIn(5, [course_id for course_id, _ in index.similar('django-web')])
+        self.assertEqual(index.vectorizer.vocabulary_, vocabulary)
+        self.assertGreater(index.drift, 0)
+
+        index.remove(3)
+        self.assertEqual(index.matrix.shape[0], 4)
+        self.assertNotIn('django-web', index.slug_to_row)
+        self.assertEqual(index.similar('django-web'), [])
+        self.assertEqual(index.slugs[index.id_to_row[5]], 'flask-web')
+
+    def test_rank_for_profile_skips_profile_courses(self):
+        index = RecommendationIndex.build(CATALOG)
+        hits = index.rank_for_profile({1: 1.0, 2: 0.5}, top_n=4)
+
+        ids = [course_id for course_id, _ in hits]
+        self.assertEqual(ids[0], 3)
+        self.assertNotIn(1, ids)
+        self.assertNotIn(2, ids)
+        self.assertEqual(index.rank_for_profile({99: 1.0}), [])
+
+
+class AutocompleteIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = AutocompleteIndex(
+            dict(record, price=0) for record in CATALOG
+        )
+
+    def test_title_prefix_matches_come_first(self):
+        slugs = [course['slug'] for course in self.index.complete('  PYTHON ')]
+        self.assertEqual(slugs[0], 'python-basics')
+        self.assertEqual(set(slugs), {'python-basics', 'advanced-python', 'django-web'})
+
+    def test_later_title_words_and_keywords_match(self):
+        self.assertEqual([course['slug'] for course in self.index.complete('web dev')], ['django-web'])
+        self.assertEqual([course['slug'] for course in self.index.complete('paint')], ['watercolor'])
+        self.assertEqual([course['slug'] for course in self.index.complete('decor')], ['advanced-python'])
+
+    def test_limit_and_misses(self):
+        self.assertEqual(len(self.index.complete('p', limit=2)), 2)
+        self.assertEqual(self.index.complete('rust'), [])
+        self.assertEqual(self.index.complete(''), [])
+
+
+@mock.patch('main.autocomplete._index', None)
+class CatalogVersionTest(TestCase):
+    @override_settings(AUTOCOMPLETE_VERSION_CHECK_INTERVAL=0)
+    def test_course_edits_rebuild_the_autocomplete_index(self):
+        category = Category.objects.create(title='Programming')
+        with self.captureOnCommitCallbacks(execute=True):
+            course = Course.objects.create(
+                title='Python Basics', category=category, is_published=True, is_test_required=False
+            )
+        self.assertEqual([hit['slug'] for hit in get_autocomplete_index().complete('pyth')], [course.slug])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            course.is_published = False
+            course.save()
+        self.assertEqual(get_autocomplete_index().complete('pyth'), [])
+
+    def test_warm_lookups_do_not_query_the_database(self):
+        category = Category.objects.create(title='Programming')
+        Course.objects.create(title='Python Basics', category=category, is_published=True, is_test_required=False)
+        self.client.get('/api/v1/main/courses/autocomplete/?q=py')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/main/courses/autocomplete/?q=pyth')
+        self.assertEqual([hit['title'] for hit in response.json()], ['Python Basics'])
+
+class FacetCountsTest(SimpleTestCase):
+    TABLE = [
+        {'level': 'beginner', 'language': 'english', 'category__slug': 'programming',
+         'category__title': 'Programming', 'price_range': 'free', 'count': 3},
+        {'level': 'advanced', 'language': 'english', 'category__slug': 'programming',
+         'category__title': 'Programming', 'price_range': 'under_1000', 'count': 2},
+        {'level': 'beginner', 'language': 'nepali', 'category__slug': 'art',
+         'category__title': 'Art', 'price_range': 'free', 'count': 1},
+    ]
+
+    def test_counts_without_filters(self):
+        facets = facet_counts(self.TABLE, {})
+        self.assertEqual(facets['level'], [{'value': 'beginner', 'count': 4}, {'value': 'advanced', 'count': 2}])
+        self.assertEqual(facets['category'][0], {'value': 'programming', 'count': 5, 'label': 'Programming'})
+        self.assertEqual(facets['price'], [{'value': 'free', 'count': 4}, {'value': 'under_1000', 'count': 2}])
+
+    def test_a_facet_ignores_its_own_filter(self):
+        facets = facet_counts(self.TABLE, {'level': 'beginner'})
+        self.assertEqual(facets['level'], [{'value': 'beginner', 'count': 4}, {'value': 'advanced', 'count': 2}])
+        self.assertEqual(facets['language'], [{'value': 'english', 'count': 3}, {'value': 'nepali', 'count': 1}])
+        self.assertEqual(facets['price'], [{'value': 'free', 'count': 4}])
+
+
+class CertificateAssetsTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.template_path = os.path.join(tmp.name, 'certificates', 'templates', 'certificate_template.png')
+        os.makedirs(os.path.dirname(self.template_path))
+        Image.new('RGB', (1200, 1100), 'white').save(self.template_path)
+        override = override_settings(MEDIA_ROOT=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_assets_are_loaded_once(self):
+        assets = get_certificate_assets()
+        self.assertIs(get_certificate_assets(), assets)
+
+        generate_certificate('Student', 'Course', certificate_id='A')
+        # Drawing happens on a copy, never on the cached template
+        self.assertEqual(assets.template.getcolors(), [(1200 * 1100, (255, 255, 255))])
+
+    def test_every_format_is_rendered(self):
+        files = generate_certificate_files('Student', 'Course', certificate_id='A')
+
+        self.assertEqual(sorted(files), ['pdf', 'png', 'webp'])
+        self.assertEqual(files['png'].name, 'cert_A.png')
+        self.assertTrue(files['png'].read().startswith(b'\x89PNG'))
+        self.assertEqual(files['webp'].read()[8:12], b'WEBP')
+        self.assertTrue(files['pdf'].read().startswith(b'%PDF'))
+
+    def test_template_change_reloads(self):
+        assets = get_certificate_assets()
+        Image.new('RGB', (800, 600), 'white').save(self.template_path)
+        stat = os.stat(self.template_path)
+        os.utime(self.template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        reloaded = get_certificate_assets()
+        self.assertIsNot(reloaded, assets)
+        self.assertEqual(reloaded.template.size, (800, 600))
+
+
+class CertificateIdentityTest(SimpleTestCase):
+    def test_certificate_ids_embed_the_enrollment(self):
+        first, second = Certificate.new_certificate_id(35), Certificate.new_certificate_id(35)
+
+        date, enrollment, random_part = first.split('-')
+        self.assertEqual((len(date), enrollment, len(random_part)), (6, 'Z', 6))
+        self.assertNotEqual(first, second)
+        self.assertEqual(Certificate.new_certificate_id(36).split('-')[1], '10')
+
+    def test_files_are_named_by_content(self):
+        name = content_addressed_name(ContentFile(b'certificate', name='cert_A.pdf'))
+
+        self.assertRegex(name, r'^certificates/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+        self.assertEqual(content_addressed_name(ContentFile(b'certificate', name='cert_B.pdf')), name)
+        self.assertNotEqual(content_addressed_name(ContentFile(b'other', name='cert_A.pdf')), name)
+
+
+class FormalTestsPassedTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(title='Programming')
+        self.student = UserAccount.objects.create_user(email='student@example.com', password='pw12345678', role='student')
+
+    def enroll(self, title, formal_tests=0):
+        # is_test_required would also create a default formal test
+        course = Course.objects.create(title=title, category=self.category, is_published=True, is_test_required=False)
+        Test.objects.create(course=course, title=f'{title} practice', is_practice=True)
+        tests = [Test.objects.create(course=course, title=f'{title} {number}') for number in range(formal_tests)]
+        return Enrollment.objects.create(student=self.student, course=course), tests
+
+    def attempt(self, test, score, status='submitted'):
+        TestAttempt.objects.create(student=self.student, test=test, status=status, total_score=score)
+
+    def test_passing_every_formal_test(self):
+        none, _ = self.enroll('No tests')
+        some, (first, _) = self.enroll('Some passed', formal_tests=2)
+        self.attempt(first, 9)
+        every, (first, second) = self.enroll('All passed', formal_tests=2)
+        self.attempt(first, 6)
+        self.attempt(first, 7)
+        self.attempt(second, 10)
+
+        with self.assertNumQueries(1):
+            passed = formal_tests_passed([none, some, every])
+        # A course without formal tests counts as not passed
+        self.assertEqual(passed, {none.id: False, some.id: False, every.id: True})
+
+    def test_unsubmitted_failing_and_practice_attempts_do_not_count(self):
+        enrollment, (test,) = self.enroll('Course', formal_tests=1)
+        self.attempt(test, 10, status='in_progress')
+        self.attempt(test, Enrollment.PASS_MARK - 1)
+        self.attempt(Test.objects.get(course=enrollment.course, is_practice=True), 10)
+        self.assertEqual(formal_tests_passed([enrollment]), {enrollment.id: False})
+
+        self.attempt(test, Enrollment.PASS_MARK)
+        self.assertEqual(formal_tests_passed([enrollment]), {enrollment.id: True})
+
+    def test_other_students_attempts_do_not_count(self):
+        enrollment, (test,) = self.enroll('Course', formal_tests=1)
+        other = UserAccount.objects.create_user(email='other@example.com', password='pw12345678', role='student')
+        TestAttempt.objects.create(student=other, test=test, status='submitted', total_score=10)
+
+        self.assertEqual(formal_tests_passed([enrollment]), {enrollment.id: False})
+        self.assertEqual(formal_tests_passed([]), {})
+
+
+class CompletedSectionsCounterTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Programming')
+        course = Course.objects.create(title='Course', category=category, is_published=True, is_test_required=False)
+        self.sections = [Section.objects.create(title=f'Section {order}', course=course, order=order) for order in range(2)]
+        student = UserAccount.objects.create_user(email='student@example.com', password='pw12345678', role='student')
+        self.enrollment = Enrollment.objects.create(student=student, course=course)
+
+    def counter(self):
+        return Enrollment.objects.values_list('completed_sections_count', flat=True).get(pk=self.enrollment.pk)
+
+    def test_stale_copies_completing_a_section_count_it_once(self):
+        progress = SectionProgress.objects.create(enrollment=self.enrollment, section=self.sections[0])
+        # Two requests that loaded the same unfinished row
+        first, second = SectionProgress.objects.get(pk=progress.pk), SectionProgress.objects.get(pk=progress.pk)
+        for copy in (first, second):
+            copy.is_completed = True
+            copy.save(update_fields=['is_completed'])
+        self.assertEqual(self.counter(), 1)
+
+        self.enrollment.check_completion_and_generate_certificate()
+        self.assertEqual((self.enrollment.progress, self.enrollment.status), (50.0, 'in_progress'))
+
+    def test_uncompleting_and_deleting(self):
+        progress = SectionProgress.objects.create(enrollment=self.enrollment, section=self.sections[0], is_completed=True)
+        SectionProgress.objects.create(enrollment=self.enrollment, section=self.sections[1], is_completed=True)
+        self.assertEqual(self.counter(), 2)
+
+        progress.is_completed = False
+        progress.save()
+        progress.save()
+        self.assertEqual(self.counter(), 1)
+
+        self.sections[1].delete()
+        self.assertEqual(self.counter(), 0)
+
+
+class BulkSectionCompletionTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Programming')
+        self.course = Course.objects.create(title='Course', category=category, is_published=True, is_test_required=False)
+        self.sections = [Section.objects.create(title=f'Section {order}', course=self.course, order=order) for order in range(3)]
+        other = Course.objects.create(title='Other', category=category, is_published=True, is_test_required=False)
+        self.other_section = Section.objects.create(title='Other section', course=other, order=0)
+
+        student = UserAccount.objects.create_user(email='student@example.com', password='pw12345678', role='student')
+        self.enrollment = Enrollment.objects.create(student=student, course=self.course)
+        self.client = APIClient()
+        self.client.force_authenticate(student)
+        self.url = f'/api/v1/main/enrollments/{self.course.slug}/sections/completed/'
+
+    def sync(self, section_ids):
+        return self.client.post(self.url, {'sections': [{'id': section_id} for section_id in section_ids]}, format='json')
+
+    def test_sync_counts_sections_and_ignores_other_courses(self):
+        response = self.sync([self.sections[0].id, self.sections[1].id, self.other_section.id, 99999])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['completed'], [self.sections[0].id, self.sections[1].id])
+        self.assertEqual(response.data['ignored'], [self.other_section.id, 99999])
+        self.assertEqual((response.data['progress'], response.data['status']), (66.67, 'in_progress'))
+        self.assertFalse(SectionProgress.objects.filter(section=self.other_section).exists())
+
+    def test_replayed_sync_is_idempotent(self):
+        self.sync([self.sections[0].id, self.sections[1].id])
+        response = self.sync([self.sections[0].id, self.sections[1].id])
+
+        self.assertEqual(response.data['completed'], [])
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_sections_count, 2)
+
+        response = self.sync([section.id for section in self.sections])
+        self.assertEqual(response.data['completed'], [self.sections[2].id])
+        self.assertEqual((response.data['progress'], response.data['status']), (100.0, 'completed'))
+
+    def test_duplicate_ids_count_once_and_future_times_are_clamped(self):
+        section = self.sections[0]
+        response = self.client.post(self.url, {'sections': [
+            {'id': section.id}, {'id': section.id, 'completed_at': '2999-01-01T00:00:00Z'},
+        ]}, format='json')
+
+        self.assertEqual(response.data['completed'], [section.id])
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_sections_count, 1)
+        self.assertLessEqual(SectionProgress.objects.get(section=section).completed_at, timezone.now())
+
+    def test_malformed_bodies_are_rejected(self):
+        for body in ([{'id': self.sections[0].id}], {'sections': [{'id': 'x'}]}, {'sections': {'id': 1}}):
+            self.assertEqual(self.client.post(self.url, body, format='json').status_code, 400)
+        self.assertFalse(SectionProgress.objects.exists())
+
+
+class CertificateVerifyTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Programming')
+        self.course = Course.objects.create(title='Python', category=category, is_published=True, is_test_required=False)
+        self.student = UserAccount.objects.create_user(
+            email='student@example.com', password='pw12345678', role='student', full_name='Student Name'
+        )
+        enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.certificate = Certificate.objects.create(enrollment=enrollment)
+        self.url = f'/api/v1/main/certificates/verify/{self.certificate.certificate_id}/'
+
+    def test_found_and_cached(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['student_name'], 'Student Name')
+        self.assertEqual(response.json()['course_title'], 'Python')
+        self.assertTrue(response['ETag'])
+        with self.assertNumQueries(1):  # the cache read
+            self.assertEqual(self.client.get(self.url).json(), response.json())
+
+    def test_not_found(self):
+        response = self.client.get('/api/v1/main/certificates/verify/MISSING/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['valid'], False)
+
+    def test_malformed_ids_skip_the_cache_and_database(self):
+        for certificate_id in ('MISSING', '261018-2F-K7Q9X2' + 'X' * 20, '261018-2f-k7q9x2', "261018-2F-K7Q9X2'--"):
+            with self.assertNumQueries(0):
+                response = self.client.get(f'/api/v1/main/certificates/verify/{certificate_id}/')
+            self.assertEqual(response.status_code, 404)
+        # Well-formed ids, including the older YYMMDD-XXX ones, are looked up
+        for certificate_id in ('261018-2F-ZZZZZZ', '240615-A7F'):
+            self.assertTrue(Certificate.is_well_formed_id(certificate_id))
+            self.assertEqual(self.client.get(f'/api/v1/main/certificates/verify/{certificate_id}/').status_code, 404)
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_edits_and_deletion_invalidate(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.full_name = 'New Name'
+            self.student.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['student_name'], 'New Name')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.title = 'Python 3'
+            self.course.save()
+        self.assertEqual(self.client.get(self.url).json()['course_title'], 'Python 3')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.certificate.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class SearchPaginationTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Programming')
+        # Mostly free courses: the price orderings are full of ties
+        for number in range(30):
+            Course.objects.create(
+                title=f'Course {number}', category=category, price=0 if number < 24 else number * 100,
+                is_published=True, is_test_required=False,
+            )
+
+    def walk(self, url, link='next'):
+        pages = []
+        while url:
+            self.assertLess(len(pages), 50, 'pagination does not terminate')
+            response = self.client.get(url).json()
+            pages.append([course['id'] for course in response['results']])
+            url = response[link]
+        return pages
+
+    # DRF's cursor counts an offset through ties and gives up after
+    # offset_cutoff (1000) of them; shrink the cutoff to hit that here
+    @mock.patch('main.search.SearchCursorPagination.offset_cutoff', 5)
+    def test_browse_pages_cover_tied_prices_exactly_once(self):
+        for sort in ('price_asc', 'price_desc', ''):
+            pages = self.walk(f'/api/v1/main/courses/search/?sort={sort}&page_size=4')
+            ids = [course_id for page in pages for course_id in page]
+
+            self.assertEqual(len(ids), 30, sort)
+            self.assertEqual(len(set(ids)), 30, sort)
+            prices = [Course.objects.get(pk=course_id).price for course_id in ids]
+            if sort:
+                self.assertEqual(prices, sorted(prices, reverse=sort == 'price_desc'), sort)
+
+    def test_previous_links_walk_back_over_the_same_pages(self):
+        forward = []
+        url = '/api/v1/main/courses/search/?sort=price_asc&page_size=7'
+        while url:
+            response = self.client.get(url).json()
+            forward.append([course['id'] for course in response['results']])
+            last, url = response, response['next']
+
+        backward = self.walk(last['previous'], link='previous')
+        self.assertEqual(backward, forward[-2::-1])
+
+
+class RankedCursorPaginationTest(SimpleTestCase):
+    def paginate(self, ids, url):
+        paginator = RankedCursorPagination()
+        page = paginator.paginate_ids(ids, Request(APIRequestFactory().get(url)))
+        return page, paginator.get_next_link(), paginator.get_previous_link()
+
+    def test_pages_walk_the_ranked_ids(self):
+        ranked = list(range(100, 145))
+        seen, url = [], 'http://testserver/search/?q=python&page_size=10'
+        while url:
+            page, url, previous = self.paginate(ranked, url)
+            seen.append(page)
+
+        self.assertEqual([course_id for page in seen for course_id in page], ranked)
+        self.assertEqual(len(seen[-1]), 5)
+        self.assertEqual(self.paginate(ranked, previous)[0], seen[-2])
+
+
+class FacetTableTest(TestCase):
+    @override_settings(SEARCH_MAX_CANDIDATES=3)
+    def test_counts_cover_matches_beyond_the_ranking_cap(self):
+        category = Category.objects.create(title='Programming')
+        for number in range(6):
+            Course.objects.create(
+                title=f'Python {number}', category=category, level='beginner' if number % 2 else 'advanced',
+                is_published=True, is_test_required=False,
+            )
+
+        response = self.client.get('/api/v1/main/courses/search/?q=python').json()
+        self.assertEqual(sum(facet['count'] for facet in response['facets']['level']), 6)
+
+
+class QueryCountTest(TestCase):
+    """Listing courses and opening an enrollment cost the same queries however big they are."""
+
+    def setUp(self):
+        self.category = Category.objects.create(title='Programming')
+        self.student = UserAccount.objects.create_user(email='student@example.com', password='pw12345678', role='student')
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def create_course(self, title, sections):
+        course = Course.objects.create(title=title, category=self.category, is_published=True, is_test_required=False)
+        for order in range(sections):
+            Section.objects.create(title=f'{title} section {order}', course=course, order=order)
+        return course
+
+    def test_course_list(self):
+        for count in (2, 10):
+            Course.objects.all().delete()
+            for number in range(count):
+                self.create_course(f'Course {number}', sections=3)
+            with self.assertNumQueries(3):
+                response = self.client.get('/api/v1/main/course/')
+            self.assertEqual(response.status_code, 200)
+
+    def test_enrollment_retrieve(self):
+        for sections in (2, 20):
+            course = self.create_course(f'Course with {sections}', sections=sections)
+            enrollment = Enrollment.objects.create(student=self.student, course=course)
+            SectionProgress.objects.create(enrollment=enrollment, section=course.sections.first(), is_completed=True)
+            with self.assertNumQueries(5):
+                response = self.client.get(f'/api/v1/main/enrollments/{course.slug}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['course']['sections']), sections)
+
+
+class CourseSectionsCounterTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Programming')
+        self.course = Course.objects.create(title='Course', category=category, is_published=True, is_test_required=False)
+        self.sections = [Section.objects.create(title=f'Section {order}', course=self.course, order=order) for order in range(2)]
+        student = UserAccount.objects.create_user(email='student@example.com', password='pw12345678', role='student')
+        self.enrollment = Enrollment.objects.create(student=student, course=self.course)
+
+    def state(self):
+        self.enrollment.refresh_from_db()
+        return self.enrollment.progress, self.enrollment.status
+
+    def test_deleting_the_last_unfinished_section_completes_the_enrollment(self):
+        SectionProgress.objects.create(enrollment=self.enrollment, section=self.sections[0], is_completed=True)
+        self.enrollment.check_completion_and_generate_certificate()
+        self.assertEqual(self.state(), (50, 'in_progress'))
+
+        self.sections[1].delete()
+        self.assertEqual(self.state(), (100, 'completed'))
+
+        Section.objects.create(title='New section', course=self.course, order=2)
+        self.assertEqual(self.state(), (50, 'in_progress'))
+
+    def test_saving_a_stale_course_keeps_the_counter(self):
+        stale = Course.objects.get(pk=self.course.pk)
+        Section.objects.create(title='New section', course=self.course, order=2)
+        stale.title = 'Renamed'
+        stale.save()
+
+        self.course.refresh_from_db()
+        self.assertEqual((self.course.title, self.course.sections_count), ('Renamed', 3))
+
+
+class ConcurrentSectionCompletionTest(TransactionTestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Programming')
+        self.course = Course.objects.create(title='Course', category=category, is_published=True, is_test_required=False)
+        self.sections = [Section.objects.create(title=f'Section {order}', course=self.course, order=order) for order in range(3)]
+        self.student = UserAccount.objects.create_user(email='student@example.com', password='pw12345678', role='student')
+        self.enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+
+    def request(self, path, body=None):
+        client = APIClient()
+        client.force_authenticate(self.student)
+        return client.post(f'/api/v1/main/enrollments/{self.course.slug}/{path}', body, format='json')
+
+    def complete_single_section(self):
+        try:
+            self.request(f'section/{self.sections[0].id}/completed/')
+        finally:
+            connection.close()
+
+    def test_single_completion_waits_for_a_bulk_sync(self):
+        with transaction.atomic():
+            # The lock a bulk sync holds from its read to its upsert
+            Enrollment.objects.select_for_update().filter(pk=self.enrollment.pk).exists()
+            single = threading.Thread(target=self.complete_single_section)
+            single.start()
+            single.join(0.5)
+            self.assertTrue(single.is_alive())
+            response = self.request('sections/completed/', {'sections': [
+                {'id': self.sections[0].id}, {'id': self.sections[1].id},
+            ]})
+            self.assertEqual(response.data['completed'], [self.sections[0].id, self.sections[1].id])
+        single.join()
+
+        self.enrollment.refresh_from_db()
+        self.assertEqual(self.enrollment.completed_sections_count, 2)
+
+
+class CertificateRenderQueueTest(TestCase):
+    def setUp(self):
+        category = Category.objects.create(title='Programming')
+        course = Course.objects.create(title='Course', category=category, is_published=True, is_test_required=False)
+        student = UserAccount.objects.create_user(email='student@example.com', password='pw12345678', role='student')
+        self.certificate = Certificate.objects.create(enrollment=Enrollment.objects.create(student=student, course=course))
+
+    @override_settings(CERTIFICATE_MAX_ATTEMPTS=3, CERTIFICATE_RETRY_DELAY=60)
+    @mock.patch('main.certificates.render_certificate', side_effect=OSError('disk full'))
+    def test_failed_renders_back_off(self, render):
+        self.assertEqual(render_next_certificate().attempts, 1)
+        # Not claimable again until its retry time
+        self.assertIsNone(render_next_certificate())
+
+        later = timezone.now() + timedelta(seconds=61)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            certificate = render_next_certificate()
+        self.assertEqual((certificate.attempts, certificate.status), (2, Certificate.STATUS_PENDING))
+        self.assertEqual(certificate.next_attempt_at, later + timedelta(seconds=120))
+        self.assertEqual(render.call_count, 2)
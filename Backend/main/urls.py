@@ -4,7 +4,7 @@ from .views import (
     CategoryViewSet, CourseViewSet, SectionViewSet,
     CartViewSet,AttachmentViewSet, 
     EnrollmentViewSet,SectionProgressViewSet,RecommendationViewSet,
-   CertificateViewSet,CourseSearchView,ReviewViewSet
+   CertificateViewSet,CertificateVerifyView,CourseSearchView,CourseAutocompleteView,ReviewViewSet
 )
 router= DefaultRouter()
 router.register(r"category", CategoryViewSet, basename="category")
@@ -21,6 +21,8 @@ router.register(r'reviews', ReviewViewSet, basename='review')
 
 urlpatterns = [
     path('courses/search/', CourseSearchView.as_view(), name='course-search'),
+    path('courses/autocomplete/', CourseAutocompleteView.as_view(), name='course-autocomplete'),
+    path('certificates/verify/<str:certificate_id>/', CertificateVerifyView.as_view(), name='certificate-verify'),
     #  path('reviews/course/<slug:course_slug>/', 
     #      ReviewViewSet.as_view({'get': 'list_course_reviews', 'post': 'create_review'}),
     #      name='course-reviews'),
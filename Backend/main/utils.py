@@ -1,4 +1,6 @@
 import os
+import threading
+from collections import namedtuple
 from django.conf import settings
 from django.utils import timezone
 from django.core.files import File
@@ -6,53 +8,192 @@ from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
 
 
-def generate_certificate(student_name, course_name, issued_at=None, certificate_id=None):
+# png: the full size certificate, palette-compressed; webp: a small preview
+# for showing it on a page; pdf: vector text over the template, fonts embedded
+CERTIFICATE_FORMATS = ('png', 'webp', 'pdf')
+
+# Font file and pixel size of each kind of text on the certificate
+FONTS = {
+    'large': ('DancingScript-Regular.ttf', 80),   # student name
+    'medium': ('arial.ttf', 50),                  # course name
+    'small': ('arial.ttf', 40),                   # ID and date
+}
+
+# The template is greyscale with soft gradients: 32 shades keep text edges
+# smooth and compress far better than full colour
+PNG_COLORS = 32
+PREVIEW_WIDTH = 1000
+WEBP_QUALITY = 80
+# Template background embedded in PDFs: about 120 dpi across the page
+PDF_BACKGROUND_WIDTH = 1400
+PDF_BACKGROUND_QUALITY = 70
+PDF_PAGE_WIDTH = 842  # points, A4 landscape like the template
+
+# Decoded template, its JPEG encoding for PDFs and the loaded fonts, kept for
+# the life of the process
+CertificateAssets = namedtuple('CertificateAssets', ['template', 'background', 'fonts'])
+
+_assets = None  # (template path, template mtime, CertificateAssets)
+_assets_lock = threading.Lock()
+
+
+def font_path(file_name):
+    return os.path.join(settings.MEDIA_ROOT, 'certificates', 'fonts', file_name)
+
+
+def load_font(path, size):
+    """TrueType font at ``size``, or Pillow's default font when the file is missing."""
+    if os.path.exists(path):
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default()
+
+
+def get_certificate_assets():
     """
-    Generate a certificate as a Django File object.
-    Ensures font fallbacks and memory-safe operation.
+    The certificate template and fonts, decoded once per process. Reloaded
+    when the template file's mtime changes (touch it after replacing fonts).
     """
+    global _assets
+
+    template_path = os.path.join(settings.MEDIA_ROOT, 'certificates', 'templates', 'certificate_template.png')
     try:
-        issued_at = issued_at or timezone.now()
-        certificate_id = certificate_id or f"CERT-{issued_at.strftime('%Y%m%d%H%M%S')}"
+        mtime = os.stat(template_path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Certificate template not found at {template_path}")
 
-        # Paths for template and fonts
-        template_path = os.path.join(settings.MEDIA_ROOT, 'certificates', 'templates', 'certificate_template.png')
-        font_arial_path = os.path.join(settings.MEDIA_ROOT, 'certificates', 'fonts', 'arial.ttf')
-        font_script_path = os.path.join(settings.MEDIA_ROOT, 'certificates', 'fonts', 'DancingScript-Regular.ttf')
+    cached = _assets
+    if cached and cached[:2] == (template_path, mtime):
+        return cached[2]
 
-        if not os.path.exists(template_path):
-            raise FileNotFoundError(f"Certificate template not found at {template_path}")
+    with _assets_lock:
+        if _assets and _assets[:2] == (template_path, mtime):
+            return _assets[2]
+        template = Image.open(template_path).convert("RGB")
+        background = BytesIO()
+        template.resize(
+            (PDF_BACKGROUND_WIDTH, round(template.height * PDF_BACKGROUND_WIDTH / template.width)),
+            Image.Resampling.LANCZOS,
+        ).save(background, format="JPEG", quality=PDF_BACKGROUND_QUALITY, optimize=True)
+        assets = CertificateAssets(
+            template=template,
+            background=background.getvalue(),
+            fonts={kind: load_font(font_path(name), size) for kind, (name, size) in FONTS.items()},
+        )
+        _assets = (template_path, mtime, assets)
+        return assets
 
-        # Open template image
-        img = Image.open(template_path).convert("RGB")
-        draw = ImageDraw.Draw(img)
 
-        # Load fonts with fallbacks
-        if os.path.exists(font_script_path):
-            font_large = ImageFont.truetype(font_script_path, 80)  # student name
-        else:
-            font_large = ImageFont.load_default()
+def certificate_text(student_name, course_name, issued_at, certificate_id):
+    """(x, y, font kind, text) of each line, in template pixels from the top left."""
+    return [
+        (180, 240, 'small', f"Certificate ID: {certificate_id}"),
+        (170, 700, 'large', student_name),
+        (170, 910, 'medium', course_name),
+        (170, 1000, 'small', f"Issued at: {issued_at.strftime('%Y-%m-%d')}"),
+    ]
+
+
+def draw_certificate(assets, lines):
+    # Start from a copy of the cached template; the fonts are shared
+    img = assets.template.copy()
+    draw = ImageDraw.Draw(img)
+    for x, y, kind, text in lines:
+        draw.text((x, y), text, font=assets.fonts[kind], fill=(0, 0, 0))
+    return img
+
+
+def encode_png(img):
+    buffer = BytesIO()
+    img.quantize(PNG_COLORS, dither=Image.Dither.NONE).save(buffer, format="PNG")
+    return buffer
 
-        if os.path.exists(font_arial_path):
-            font_medium = ImageFont.truetype(font_arial_path, 50)  # course name
-            font_small = ImageFont.truetype(font_arial_path, 40)   # ID and date
+
+def encode_webp(img):
+    preview = img.resize((PREVIEW_WIDTH, round(img.height * PREVIEW_WIDTH / img.width)), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    preview.save(buffer, format="WEBP", quality=WEBP_QUALITY)
+    return buffer
+
+
+def render_pdf(assets, lines):
+    """
+    One page: the template as a JPEG background and the text as real PDF
+    text in the TrueType fonts (subset and embedded by reportlab).
+    """
+    # reportlab is only needed by the process that renders certificates
+    from reportlab import rl_config
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+
+    width, height = assets.template.size
+    scale = PDF_PAGE_WIDTH / width
+    page_height = height * scale
+
+    # Binary streams: ASCII85 would grow the embedded JPEG by a quarter
+    rl_config.useA85 = 0
+    buffer = BytesIO()
+    # invariant: no creation date or random document id, so the same
+    # certificate always renders to the same bytes (files are content addressed)
+    pdf = canvas.Canvas(buffer, pagesize=(PDF_PAGE_WIDTH, page_height), pageCompression=1, invariant=1)
+    pdf.drawImage(ImageReader(BytesIO(assets.background)), 0, 0, width=PDF_PAGE_WIDTH, height=page_height)
+    for x, y, kind, text in lines:
+        name, size = FONTS[kind]
+        path = font_path(name)
+        if os.path.exists(path):
+            font_name = os.path.splitext(name)[0]
+            if font_name not in pdfmetrics.getRegisteredFontNames():
+                pdfmetrics.registerFont(TTFont(font_name, path))
+            ascent = assets.fonts[kind].getmetrics()[0]
         else:
-            font_medium = font_small = ImageFont.load_default()
+            font_name, ascent = 'Helvetica', size * 0.8
+        # Pillow places text by the top of the line, PDF by its baseline
+        pdf.setFont(font_name, size * scale)
+        pdf.drawString(x * scale, page_height - (y + ascent) * scale, text)
+    pdf.showPage()
+    pdf.save()
+    return buffer
 
-        # Draw text on the certificate (coordinates preserved)
-        draw.text((180, 240), f"Certificate ID: {certificate_id}", font=font_small, fill=(0, 0, 0))
-        draw.text((170, 700), student_name, font=font_large, fill=(0, 0, 0))
-        draw.text((170, 910), course_name, font=font_medium, fill=(0, 0, 0))
-        draw.text((170, 1000), f"Issued at: {issued_at.strftime('%Y-%m-%d')}", font=font_small, fill=(0, 0, 0))
 
-        # Save image to memory buffer
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
+def generate_certificate_files(student_name, course_name, issued_at=None, certificate_id=None, formats=CERTIFICATE_FORMATS):
+    """
+    Render the certificate in each of ``formats`` (see CERTIFICATE_FORMATS)
+    and return {format: Django File}. The image is drawn once for all the
+    raster formats.
+    """
+    try:
+        issued_at = issued_at or timezone.now()
+        certificate_id = certificate_id or f"CERT-{issued_at.strftime('%Y%m%d%H%M%S')}"
+
+        assets = get_certificate_assets()
+        lines = certificate_text(student_name, course_name, issued_at, certificate_id)
+        img = draw_certificate(assets, lines) if {'png', 'webp'} & set(formats) else None
 
-        # Return Django File object
-        file_name = f"cert_{certificate_id}.png"
-        return File(buffer, name=file_name)
+        files = {}
+        for file_format in formats:
+            if file_format == 'png':
+                buffer = encode_png(img)
+            elif file_format == 'webp':
+                buffer = encode_webp(img)
+            elif file_format == 'pdf':
+                buffer = render_pdf(assets, lines)
+            else:
+                raise ValueError(f"Unknown certificate format {file_format!r}")
+            buffer.seek(0)
+            files[file_format] = File(buffer, name=f"cert_{certificate_id}.{file_format}")
+        return files
 
     except Exception as e:
         raise ValueError(f"Certificate generation failed: {str(e)}")
+
+
+def generate_certificate(student_name, course_name, issued_at=None, certificate_id=None, file_format='png'):
+    """
+    Generate a certificate as a Django File object.
+    Ensures font fallbacks and memory-safe operation.
+    """
+    files = generate_certificate_files(
+        student_name, course_name, issued_at=issued_at, certificate_id=certificate_id, formats=(file_format,)
+    )
+    return files[file_format]
@@ -10,7 +10,7 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework import filters
-from django.db.models import Sum
+from django.db.models import Count, Sum
 from django.db import IntegrityError
 from payments.models import Payment
 from rest_framework import viewsets, status, permissions, filters
@@ -138,7 +138,11 @@ class CourseViewSet(ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        queryset = Course.objects.all()
+        # Load sections, their attachments and the enrollment count up front so
+        # a list response costs the same few queries however many courses it has
+        queryset = Course.objects.select_related('category').prefetch_related(
+            'sections__attachments'
+        ).annotate(enrolled_count=Count('enrollments', distinct=True))
 
         # If user is not admin, only return published courses
         if not user.is_authenticated or user.role != 'admin':
@@ -322,8 +326,12 @@ class SectionViewSet(ModelViewSet):
 
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from django.contrib.postgres.search import TrigramSimilarity
-from django.db.models import F,Q,ExpressionWrapper,FloatField,Case, When, IntegerField
+from .search import (
+    BROWSE_ORDERINGS, RankedCursorPagination, SearchCursorPagination,
+    cached_facet_table, cached_ranked_course_ids, facet_counts, filter_courses, selected_filters,
+)
+from .autocomplete import get_autocomplete_index
+
 
 class CourseSearchView(APIView):
    permission_classes = [AllowAny] 
@@ -333,65 +341,45 @@ class CourseSearchView(APIView):
         sort = request.GET.get('sort', '')
         user = request.user
 
-        if query:
-            if len(query) < 1:
-                courses = Course.objects.filter(
-                    Q(title__icontains=query) | Q(keywords__icontains=query)
-                )
-            else:
-                threshold = 0.05 if len(query) < 6 else 0.15
-                courses = Course.objects.annotate(
-                    similarity_title=TrigramSimilarity('title', query),
-                    similarity_keywords=TrigramSimilarity('keywords', query),
-                     
-                    exact_title_match=Case(
-                        When(title__iexact=query, then=1),
-                        default=0,
-                        output_field=IntegerField()
-                    ),
-                    exact_keyword_match=Case(
-                        When(keywords__icontains=query, then=1),
-                        default=0,
-                        output_field=IntegerField()
-                    )
-    
-                ).annotate(
-                    total_similarity=ExpressionWrapper(
-                        (F('similarity_title') * 0.7 + F('similarity_keywords') * 0.3) +
-                        (F('exact_title_match') * 0.5) +     
-                        (F('exact_keyword_match') * 0.2),    
-                        output_field=FloatField()
-                    )
-                ).filter(
-                    Q(total_similarity__gt=threshold) |
-                    Q(title__icontains=query) |
-                    Q(keywords__icontains=query)
-                ).order_by('-total_similarity')
+        courses = Course.objects.all()
+        audience = 'admin'
+        if not user.is_authenticated or user.role != 'admin':
+            courses = courses.filter(is_published=True)
+            audience = 'public'
+        filters = selected_filters(request.GET)
+
+        if query.strip():
+            # Rank (or reuse the cached ranking of) a capped list of ids, then
+            # load only the requested page
+            paginator = RankedCursorPagination()
+            ranked_ids = cached_ranked_course_ids(courses, query, audience, filters)
+            page_ids = paginator.paginate_ids(ranked_ids, request)
+            found = courses.select_related('category').in_bulk(page_ids)
+            page = [found[course_id] for course_id in page_ids if course_id in found]
+        else:
+            paginator = SearchCursorPagination()
+            paginator.ordering = BROWSE_ORDERINGS.get(sort, paginator.ordering)
+            page = paginator.paginate_queryset(
+                filter_courses(courses, filters).select_related('category'), request, view=self
+            )
 
-                for course in courses:
-                    print(f"{course.title} - Total Similarity: {getattr(course, 'total_similarity', 'N/A')}")
+        serializer = CourseListSerializer(page, many=True, context={'request': request})
+        response = paginator.get_paginated_response(serializer.data)
+        response.data['facets'] = facet_counts(cached_facet_table(courses, query, audience), filters)
+        return response
 
-            
-            if not user.is_authenticated or user.role != 'admin':
-                courses = courses.filter(is_published=True)
 
-        else:
-            courses = Course.objects.all()
-            
-            
-            if not user.is_authenticated or user.role != 'admin':
-                courses = courses.filter(is_published=True)
-
-           
-            if sort == 'price_asc':
-                courses = courses.order_by('price')
-            elif sort == 'price_desc':
-                courses = courses.order_by('-price')
-            else:
-                courses = courses.order_by('-created_at')
-
-        serializer = CourseListSerializer(courses, many=True, context={'request': request})
-        return Response(serializer.data)
+class CourseAutocompleteView(APIView):
+    """Typeahead suggestions for the search box, served from the in-memory prefix index."""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            limit = int(request.GET.get('limit', 8))
+        except ValueError:
+            limit = 8
+        index = get_autocomplete_index()
+        return Response(index.complete(request.GET.get('q', ''), limit=min(limit, 20)))
    
 # cart viewset
 
@@ -470,8 +458,10 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from .models import Enrollment, Section, SectionProgress, Certificate
-from .serializers import EnrollmentSerializer, EnrolledCourseDetailSerializer, SectionProgressSerializer
+from .models import Enrollment, Section, SectionProgress, Certificate, adjust_completed_sections
+from django.db import transaction
+from .serializers import EnrollmentSerializer, EnrolledCourseDetailSerializer, SectionProgressSerializer, SectionCompletionSerializer
+from .services import formal_tests_passed
 # from smarttest.models import TestAttempt
 
 class EnrollmentViewSet(viewsets.ModelViewSet):
@@ -488,16 +478,16 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
         return EnrollmentSerializer
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve', 'mark_completed', 'section_progress', 'mark_section_completed', 'update_last_accessed']:
+        if self.action in ['list', 'retrieve', 'mark_completed', 'section_progress', 'mark_section_completed', 'mark_sections_completed', 'update_last_accessed']:
             return [permissions.IsAuthenticated()]
         return [IsStudentUser()]  # custom permission for students
 
     def get_queryset(self):
         user = self.request.user
         queryset = Enrollment.objects.select_related(
-            'course', 'student'
+            'course__category', 'student'
         ).prefetch_related(
-            'section_progresses', 'course__sections', 'course__tests'
+            'section_progresses', 'course__sections__attachments', 'course__tests'
         )
         if user.is_staff or getattr(user, 'role', None) == 'admin':
             return queryset
@@ -508,6 +498,24 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
         slug = self.kwargs.get('course__slug')
         return get_object_or_404(queryset, course__slug=slug, student=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        enrollments = list(self.filter_queryset(self.get_queryset()))
+        # is_test_passed for every enrollment comes from one grouped query
+        context = self.get_serializer_context()
+        context['formal_tests_passed'] = formal_tests_passed(enrollments)
+        serializer = self.get_serializer(enrollments, many=True, context=context)
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        enrollment = self.get_object()
+        # Every section's is_completed is a set lookup instead of two queries
+        context = self.get_serializer_context()
+        context['completed_section_ids'] = {
+            progress.section_id for progress in enrollment.section_progresses.all() if progress.is_completed
+        }
+        serializer = self.get_serializer(enrollment, context=context)
+        return Response(serializer.data)
+
     # ---------- ACTIONS ----------
     @action(detail=True, methods=['post'])
     def mark_completed(self, request, course__slug=None):
@@ -554,6 +562,60 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
         enrollment.check_completion_and_generate_certificate()
         return Response({'message': 'Section marked as completed', 'status': enrollment.status}, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=['post'], url_path='sections/completed')
+    def mark_sections_completed(self, request, course__slug=None):
+        """
+        Bulk completion for clients syncing after being offline. Body:
+        {"sections": [{"id": 12, "completed_at": "2026-01-01T10:00:00Z"}, ...]}.
+        Completion (and any certificate) is evaluated once for the whole batch.
+        completed_at values in the future are clamped to now.
+        """
+        enrollment = self.get_object()
+        if not isinstance(request.data, dict):
+            return Response({'detail': 'Expected an object with a "sections" list.'}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = SectionCompletionSerializer(data=request.data.get('sections', []), many=True)
+        serializer.is_valid(raise_exception=True)
+
+        now = timezone.now()
+        completed_at = {item['id']: min(item.get('completed_at') or now, now) for item in serializer.validated_data}
+        section_ids = set(
+            Section.objects.filter(course=enrollment.course, id__in=completed_at).values_list('id', flat=True)
+        )
+
+        with transaction.atomic():
+            # Serialize with other syncs and with SectionProgress.save, which
+            # takes the same lock, so the counter stays exact
+            Enrollment.objects.select_for_update().filter(pk=enrollment.pk).exists()
+            already_completed = set(
+                SectionProgress.objects.filter(
+                    enrollment=enrollment, section_id__in=section_ids, is_completed=True
+                ).values_list('section_id', flat=True)
+            )
+            newly_completed = sorted(section_ids - already_completed)
+            SectionProgress.objects.bulk_create(
+                [
+                    SectionProgress(
+                        enrollment=enrollment, section_id=section_id,
+                        is_completed=True, completed_at=completed_at[section_id],
+                    )
+                    for section_id in newly_completed
+                ],
+                update_conflicts=True,
+                unique_fields=['enrollment', 'section'],
+                update_fields=['is_completed', 'completed_at', 'updated_at'],
+            )
+            # bulk_create skips SectionProgress.save, so count the flips here
+            if newly_completed:
+                adjust_completed_sections(enrollment.id, len(newly_completed))
+
+        enrollment.check_completion_and_generate_certificate()
+        return Response({
+            'completed': newly_completed,
+            'ignored': sorted(set(completed_at) - section_ids),
+            'progress': enrollment.progress,
+            'status': enrollment.status,
+        }, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['patch'], url_path='update-last-accessed')
     def update_last_accessed(self, request, course__slug=None):
         enrollment = self.get_object()
@@ -660,16 +722,18 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
+from django.http import FileResponse
 from .models import Certificate, Enrollment, Course
 from .serializers import CertificateSerializer
-from .utils import generate_certificate
+from .certificates import issue_certificate
 
 
 class CertificateViewSet(ModelViewSet):
     """
     ViewSet for handling certificates:
     - List certificates for a student (or all for staff)
-    - Generate certificate if sections completed and test passed
+    - Queue a certificate if sections completed and test passed
+    - Download a certificate as png, webp or pdf
     """
     queryset = Certificate.objects.all()
     serializer_class = CertificateSerializer
@@ -713,7 +777,8 @@ class CertificateViewSet(ModelViewSet):
         enrollment = get_object_or_404(Enrollment, course=course, student=student)
 
         # Check sections completed AND test passed
-        if not enrollment.is_sections_completed or not getattr(enrollment, 'is_test_passed', False):
+        sections_completed = enrollment.completed_sections_count >= course.sections_count
+        if not sections_completed or not formal_tests_passed([enrollment])[enrollment.id]:
             return Response(
                 {"error": "Complete all sections and pass the test to generate certificate."},
                 status=status.HTTP_400_BAD_REQUEST
@@ -723,42 +788,48 @@ class CertificateViewSet(ModelViewSet):
 
     def _generate_certificate(self, enrollment):
         """
-        Core certificate generation logic:
-        - Prevents duplicate generation
-        - Generates file and saves to model
+        Queue the certificate (once) and return it straight away: 200 when
+        its file is ready, 202 while the render_certificates worker has yet
+        to draw it. Clients poll the certificate's status until it is ready.
         """
-        # Return existing certificate if it already exists
-        if hasattr(enrollment, 'certificate'):
-            serializer = self.get_serializer(enrollment.certificate, context={'request': self.request})
+        certificate = issue_certificate(enrollment)
+        serializer = self.get_serializer(certificate, context={'request': self.request})
+        if certificate.status == Certificate.STATUS_READY:
             return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
-        try:
-            # Step 1: Create certificate object (generates certificate_id in model)
-            certificate = Certificate.objects.create(enrollment=enrollment)
-
-            # Step 2: Generate certificate file (returns Django File object)
-            certificate_file = generate_certificate(
-                student_name=enrollment.student.full_name,
-                course_name=enrollment.course.title,
-                issued_at=certificate.issued_at,
-                certificate_id=certificate.certificate_id
+    @action(detail=True, methods=['get'])
+    def download(self, request, certificate_id=None):
+        """
+        Download the certificate in ``?file_format=`` png (default), webp
+        (small preview) or pdf. Not ``?format=``: DRF uses that to pick a
+        renderer.
+        """
+        certificate = self.get_object()
+        file_format = request.query_params.get('file_format', 'png')
+        if file_format not in Certificate.FILE_FIELDS:
+            return Response(
+                {"error": f"file_format must be one of: {', '.join(Certificate.FILE_FIELDS)}."},
+                status=status.HTTP_400_BAD_REQUEST
             )
+        if certificate.status != Certificate.STATUS_READY:
+            return Response({"status": certificate.status}, status=status.HTTP_202_ACCEPTED)
 
-            # Step 3: Save the file into FileField
-            certificate.certificate_file.save(certificate_file.name, certificate_file, save=True)
-
-            # Step 4: Serialize and return
-            serializer = self.get_serializer(certificate, context={'request': self.request})
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-
-        except Exception as e:
-            # Rollback on failure
-            if 'certificate' in locals():
-                certificate.delete()
+        certificate_file = getattr(certificate, Certificate.FILE_FIELDS[file_format])
+        if not certificate_file:
+            # Issued before this format existed: `manage.py reissue_certificates` renders it
             return Response(
-                {"error": f"Certificate generation failed: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"error": f"No {file_format} file for this certificate."},
+                status=status.HTTP_404_NOT_FOUND
             )
+        response = FileResponse(
+            certificate_file.open('rb'),
+            as_attachment=True,
+            filename=f"certificate_{certificate.certificate_id}.{file_format}",
+        )
+        # Files only change when certificates are reissued
+        response['Cache-Control'] = 'private, max-age=86400'
+        return response
 
     def list(self, request, *args, **kwargs):
         """
@@ -782,6 +853,72 @@ class CertificateViewSet(ModelViewSet):
         return response
 
 
+# public certificate verification
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.views import APIView
+from rest_framework.permissions import AllowAny
+from .caching import certificate_key
+
+
+class CertificateVerifyView(APIView):
+    """
+    Public lookup of a certificate by its id, for employers: who earned it,
+    for which course and when. Answers come from the shared read-through
+    cache (invalidated by the signals in main/signals.py) with an ETag, so
+    repeat verifications are a cache hit or a 304 and never run the lookup.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, certificate_id):
+        # Ids that cannot exist are answered without touching the cache or the database
+        if not Certificate.is_well_formed_id(certificate_id):
+            return Response({"valid": False, "error": "Certificate not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        key = certificate_key(certificate_id)
+        entry = cache.get(key)
+        if entry is None:
+            entry = self.lookup(certificate_id)
+            ttl = settings.CERTIFICATE_VERIFY_TTL if entry['data'] else settings.CERTIFICATE_VERIFY_MISS_TTL
+            cache.set(key, entry, ttl)
+
+        if entry['data'] is None:
+            response = Response({"valid": False, "error": "Certificate not found."}, status=status.HTTP_404_NOT_FOUND)
+            response['Cache-Control'] = f"public, max-age={settings.CERTIFICATE_VERIFY_MISS_TTL}"
+            return response
+
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if entry['etag'] in etags or '*' in etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(entry['data'])
+        response['ETag'] = entry['etag']
+        response['Cache-Control'] = f"public, max-age={settings.CERTIFICATE_VERIFY_MAX_AGE}"
+        return response
+
+    def lookup(self, certificate_id):
+        row = Certificate.objects.filter(certificate_id=certificate_id).values(
+            'certificate_id', 'issued_at',
+            'enrollment__student__full_name', 'enrollment__course__title', 'enrollment__course__slug',
+        ).first()
+        if row is None:
+            return {'data': None}
+        data = {
+            'valid': True,
+            'certificate_id': row['certificate_id'],
+            'student_name': row['enrollment__student__full_name'],
+            'course_title': row['enrollment__course__title'],
+            'course_slug': row['enrollment__course__slug'],
+            'issued_at': row['issued_at'].date().isoformat(),
+        }
+        etag = quote_etag(hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest())
+        return {'data': data, 'etag': etag}
+
+
 # review view set
 
 from rest_framework import viewsets, permissions, status
@@ -883,81 +1020,89 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
 
 #content based recommendation system
-import pandas as pd #type: ignore
-from sklearn.feature_extraction.text import TfidfVectorizer #type: ignore
-from sklearn.metrics.pairwise import cosine_similarity #type: ignore
-from nltk.corpus import stopwords #type: ignore
-from main.models import Course
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from main.models import Course, CourseNeighbor
+from main.caching import for_you_key
+# main.recommendation pulls in numpy/scipy/scikit-learn, so it is only
+# imported inside the functions below, on the first recommendation request
+
+
+def stored_recommendations(course_slug: str, top_n: int = 4):
+    # Single indexed lookup on the precomputed course_neighbor table; the
+    # content and co-enrollment lists (at most top-K rows each) are blended here
+    neighbors = CourseNeighbor.objects.filter(
+        course__slug=course_slug,
+        neighbor__is_published=True,
+    ).select_related('neighbor__category')
+
+    by_source = {CourseNeighbor.SOURCE_CONTENT: [], CourseNeighbor.SOURCE_CO_ENROLLMENT: []}
+    for neighbor in neighbors:
+        by_source[neighbor.source].append(neighbor)
+
+    # Courses nobody has co-enrolled in yet are ranked on content alone
+    co_weight = settings.RECOMMENDER_CO_ENROLLMENT_WEIGHT if by_source[CourseNeighbor.SOURCE_CO_ENROLLMENT] else 0
+    source_weights = {
+        CourseNeighbor.SOURCE_CONTENT: 1 - co_weight,
+        CourseNeighbor.SOURCE_CO_ENROLLMENT: co_weight,
+    }
+    blended = {}
+    for source, source_neighbors in by_source.items():
+        for neighbor in source_neighbors:
+            course, score = blended.get(neighbor.neighbor_id, (neighbor.neighbor, 0.0))
+            blended[neighbor.neighbor_id] = (course, score + source_weights[source] * neighbor.score)
+
+    return sorted(blended.values(), key=lambda hit: hit[1], reverse=True)[:top_n]
 
 
 def recommend_courses_with_scores(course_slug: str, top_n: int = 4):
     try:
-        courses = Course.objects.filter(is_published=True).values(
-            'id', 'title', 'description', 'keywords', 'slug',
-            'category__title', 'price', 'level', 'language'
-        )
-        df = pd.DataFrame.from_records(courses)
-        if df.empty:
-            return []
-
-        df["combined_text"] = (
-            df["title"].fillna("") + " " +
-            df["keywords"].fillna("") + " " +
-            df["category__title"].fillna("") + " " +
-            df["description"].fillna("") + " " +
-            df["level"].fillna("") + " " +
-            # df["price"].fillna("") + " " +
-            df["language"].fillna("")
-        ).str.lower()
-
-        try:
-            stop_words = list(stopwords.words("english"))
-        except LookupError:
-            import nltk #type: ignore
-            nltk.download("stopwords")
-            stop_words = list(stopwords.words("english"))
+        from main.recommendation import get_index
 
-        vectorizer = TfidfVectorizer(stop_words=stop_words, max_features=5000)
-        # vectorizer = TfidfVectorizer(stop_words=stop_words, max_features=5000, ngram_range=(1,2))
+        # One sparse row product against the prebuilt TF-IDF index
+        hits = get_index().similar(course_slug, top_n=top_n)
 
-        tfidf_matrix = vectorizer.fit_transform(df["combined_text"])
-
-        try:
-            current_index = df[df["slug"] == course_slug].index[0]
-        except IndexError:
-            return []
-
-        similarity_scores = cosine_similarity(
-            tfidf_matrix[current_index:current_index + 1],
-            tfidf_matrix
-        ).flatten()
-
-    
-        threshold = 0.10
-        # Filter indices where similarity is above threshold and exclude the course itself
-        filtered_indices = [
-            i for i, score in enumerate(similarity_scores)
-            if score >= threshold and i != current_index
+        # Hydrate every hit with one query, keeping the similarity order
+        courses = Course.objects.filter(is_published=True).select_related('category').in_bulk(
+            [course_id for course_id, _ in hits]
+        )
+        return [
+            (courses[course_id], similarity)
+            for course_id, similarity in hits
+            if course_id in courses
         ]
-
-        # Sort the filtered indices by similarity descending
-        filtered_indices = sorted(filtered_indices, key=lambda i: similarity_scores[i], reverse=True)
-
-        # Limit to top_n results
-        top_indices = filtered_indices[:top_n]
-
-        results = []
-        for i in top_indices:
-            course_id = df.iloc[i]["id"]
-            similarity = similarity_scores[i]
-            course = Course.objects.get(id=course_id)
-            results.append((course, similarity))
-
-        return results
     
     except Exception as e:
         print(f"Recommendation error: {str(e)}")
         return []
+
+
+def personalized_recommendation_ids(student):
+    """Ranked [(course_id, score), ...] for a student, cached until their enrollments change."""
+    key = for_you_key(student.id)
+    hits = cache.get(key)
+    if hits is not None:
+        return hits
+
+    from main.recommendation import enrollment_weight, get_index
+
+    # Enrolled courses with the student's own rating (if reviewed) in one query
+    enrollments = Enrollment.objects.filter(student=student).annotate(
+        rating=Subquery(
+            Review.objects.filter(
+                student=OuterRef('student'), course=OuterRef('course')
+            ).values('rating')[:1]
+        )
+    ).values_list('course_id', 'progress', 'rating')
+    weights = {
+        course_id: enrollment_weight(progress, rating)
+        for course_id, progress, rating in enrollments
+    }
+
+    hits = get_index().rank_for_profile(weights, top_n=settings.RECOMMENDER_FOR_YOU_SIZE)
+    cache.set(key, hits, settings.RECOMMENDER_FOR_YOU_TTL)
+    return hits
         
 
     
@@ -984,14 +1129,40 @@ class RecommendationViewSet(ViewSet):
         if not slug:
             return Response([])
 
-        # Get recommended courses with similarity scores
-        recommended_with_scores = recommend_courses_with_scores(slug)
+        # Get recommended courses with similarity scores, falling back to the
+        # live index for courses the neighbor refresh has not reached yet
+        recommended_with_scores = (
+            stored_recommendations(slug) or recommend_courses_with_scores(slug)
+        )
 
-        # Serialize each course and include the similarity score
-        serialized_data = []
-        for course, score in recommended_with_scores:
-            data = CourseListSerializer(course).data
+        # Serialize all courses at once and include the similarity scores
+        courses = [course for course, _ in recommended_with_scores]
+        serialized_data = CourseListSerializer(
+            courses, many=True, context=self.get_serializer_context()
+        ).data
+        for data, (_, score) in zip(serialized_data, recommended_with_scores):
             data["similarity_score"] = round(float(score), 3)  # Keep score readable
-            serialized_data.append(data)
+
+        return Response(serialized_data)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated], url_path='for-you')
+    def for_you(self, request):
+        """Personalized shelf built from the student's enrollment history."""
+        hits = personalized_recommendation_ids(request.user)
+        try:
+            limit = int(request.query_params.get("limit", 8))
+        except ValueError:
+            limit = 8
+        hits = hits[:max(limit, 0)]
+
+        courses = Course.objects.filter(is_published=True).select_related('category').in_bulk(
+            [course_id for course_id, _ in hits]
+        )
+        hits = [(courses[course_id], score) for course_id, score in hits if course_id in courses]
+        serialized_data = CourseListSerializer(
+            [course for course, _ in hits], many=True, context=self.get_serializer_context()
+        ).data
+        for data, (_, score) in zip(serialized_data, hits):
+            data["similarity_score"] = round(float(score), 3)
 
         return Response(serialized_data)
\ No newline at end of file
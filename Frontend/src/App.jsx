@@ -23,6 +23,7 @@ import Checkout from './pages/student/Checkout'
 import PaymentSuccess from './pages/student/PaymentSuccess'
 import Profile from './pages/student/Profile'
 import CourseSearch from './pages/student/CourseSearch'
+import VerifyCertificate from './pages/VerifyCertificate'
 import CreateTest from './pages/student/smarttest/CreateTest'
 import TestAttemptPage from './pages/student/smarttest/TestAttemptPage'
 import MyTestPage from './pages/student/smarttest/MyTestPage'
@@ -114,6 +115,10 @@ const appRouter = createBrowserRouter([
         path: "courses/search",
         element: <CourseSearch />
       },
+      {
+        path: "verify/:certificateId",
+        element: <VerifyCertificate />
+      },
       //protected routrs for student role
       {
         element: <ProtectedRoutes allowedRoles={['student']} />,
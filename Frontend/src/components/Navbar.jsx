@@ -52,7 +52,7 @@ import { useLogoutUserMutation, useLoadUserQuery } from '@/features/api/authApi'
 import { useDispatch } from 'react-redux';
 import { toast } from 'sonner';
 import { authApi } from '@/features/api/authApi';
-import { useSearchCoursesQuery } from '@/features/api/courseApi';
+import { useAutocompleteCoursesQuery } from '@/features/api/courseApi';
 import CourseSearchResults from '@/pages/student/CourseSearchResults';
 
 const Navbar = () => {
@@ -68,8 +68,8 @@ const Navbar = () => {
     data: searchResults,
     error: searchError,
     isLoading: searchLoading,
-  } = useSearchCoursesQuery(
-    { q: searchQuery, field: searchField },
+  } = useAutocompleteCoursesQuery(
+    searchQuery,
     { skip: !searchQuery.trim() }
   );
 
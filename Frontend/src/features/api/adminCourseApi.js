@@ -115,11 +115,12 @@ export const adminCourseApi = createApi({
         }),
         // search courses
         searchCourses: builder.query({
-            query: ({ q, field = "both", sort = "" }) => {
+            query: ({ q, field = "both", sort = "", cursor = "" }) => {
                 const params = new URLSearchParams();
                 if (q.trim()) params.append("q", q.trim());
                 if (field !== "both") params.append("field", field);
                 if (sort) params.append("sort", sort);
+                if (cursor) params.append("cursor", cursor);
 
                 return {
                     url: `courses/search/?${params.toString()}`,
@@ -128,6 +129,20 @@ export const adminCourseApi = createApi({
                     credentials: "omit",
                 };
             },
+            // results are cursor paginated: keep the page and the cursor of the next one
+            transformResponse: (response) => ({
+                results: response.results,
+                next: response.next ? new URL(response.next).searchParams.get("cursor") : null,
+            }),
+            // one cache entry per search; "load more" (a cursor) appends to it
+            serializeQueryArgs: ({ endpointName, queryArgs: { cursor, ...args } }) =>
+                `${endpointName}(${JSON.stringify(args)})`,
+            merge: (current, incoming, { arg }) => {
+                if (!arg.cursor) return incoming;
+                current.results.push(...incoming.results);
+                current.next = incoming.next;
+            },
+            forceRefetch: ({ currentArg, previousArg }) => currentArg?.cursor !== previousArg?.cursor,
         }),
     }),
 })
@@ -33,11 +33,20 @@ export const certificateApi = createApi({
             providesTags: ['Certificate']
         }),
 
-        // Download certificate file
-        downloadCertificate: builder.query({
+        // Public verification of a certificate by its id
+        verifyCertificate: builder.query({
             query: (certificateId) => ({
+                url: `certificates/verify/${encodeURIComponent(certificateId)}/`,
+                method: "GET"
+            }),
+        }),
+
+        // Download certificate file as png, webp (preview) or pdf
+        downloadCertificate: builder.query({
+            query: ({ certificateId, fileFormat = "png" }) => ({
                 url: `certificates/${certificateId}/download/`,
                 method: "GET",
+                params: { file_format: fileFormat },
                 responseHandler: (response) => response.blob(),
             }),
         })
@@ -47,5 +56,6 @@ export const certificateApi = createApi({
 export const {
     useGenerateCertificateMutation,
     useGetMyCertificatesQuery,
-    useLazyDownloadCertificateQuery
+    useLazyDownloadCertificateQuery,
+    useVerifyCertificateQuery
 } = certificateApi;
\ No newline at end of file
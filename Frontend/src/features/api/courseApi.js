@@ -47,11 +47,16 @@ export const courseApi = createApi({
         // search courses
 
         searchCourses: builder.query({
-            query: ({ q, field = "both", sort = "" }) => {
+            query: ({ q, field = "both", sort = "", cursor = "", filters = {} }) => {
                 const params = new URLSearchParams();
                 if (q.trim()) params.append("q", q.trim());
                 if (field !== "both") params.append("field", field);
                 if (sort) params.append("sort", sort);
+                if (cursor) params.append("cursor", cursor);
+                // server-side facets: level, language, category (slug), price
+                Object.entries(filters).forEach(([facet, value]) => {
+                    if (value) params.append(facet, value);
+                });
 
                 return {
                     url: `courses/search/?${params.toString()}`,
@@ -60,6 +65,30 @@ export const courseApi = createApi({
                     credentials: "omit",
                 };
             },
+            // results are cursor paginated: keep the page, the cursor of the next one and the facet counts
+            transformResponse: (response) => ({
+                results: response.results,
+                next: response.next ? new URL(response.next).searchParams.get("cursor") : null,
+                facets: response.facets,
+            }),
+            // one cache entry per search; "load more" (a cursor) appends to it
+            serializeQueryArgs: ({ endpointName, queryArgs: { cursor, ...args } }) =>
+                `${endpointName}(${JSON.stringify(args)})`,
+            merge: (current, incoming, { arg }) => {
+                if (!arg.cursor) return incoming;
+                current.results.push(...incoming.results);
+                current.next = incoming.next;
+            },
+            forceRefetch: ({ currentArg, previousArg }) => currentArg?.cursor !== previousArg?.cursor,
+        }),
+
+        // typeahead suggestions for the search box
+        autocompleteCourses: builder.query({
+            query: (q) => ({
+                url: `courses/autocomplete/?${new URLSearchParams({ q: q.trim() }).toString()}`,
+                method: "GET",
+                credentials: "omit",
+            }),
         }),
         // startFreeCourse: builder.mutation({
         //     query: (slug) => ({
@@ -75,4 +104,5 @@ export const {
     useGetCourseStatsQuery,
     useGetSectionsByCourseQuery,
     useSearchCoursesQuery,
+    useAutocompleteCoursesQuery,
 } = courseApi;
@@ -0,0 +1,48 @@
+// src/pages/VerifyCertificate.jsx
+import React from "react";
+import { useParams } from "react-router-dom";
+import { useVerifyCertificateQuery } from "@/features/api/certificateApi";
+import { BadgeCheck, XCircle } from "lucide-react";
+
+const VerifyCertificate = () => {
+  const { certificateId } = useParams();
+  const { data, isLoading, isError } = useVerifyCertificateQuery(certificateId);
+
+  if (isLoading) {
+    return (
+      <div className="flex flex-col items-center justify-center min-h-[60vh] space-y-4">
+        <div className="w-16 h-16 border-8 border-gray-300 border-t-green-500 rounded-full animate-spin" />
+        <span className="text-lg font-medium text-gray-600">Verifying certificate...</span>
+      </div>
+    );
+  }
+
+  if (isError || !data?.valid) {
+    return (
+      <div className="max-w-md p-6 mx-auto mt-16 text-center bg-red-50 rounded-lg">
+        <XCircle className="w-12 h-12 mx-auto mb-4 text-red-500" />
+        <h3 className="mb-2 text-xl font-semibold text-red-600">Certificate not found</h3>
+        <p className="text-gray-700">
+          No certificate with the ID <span className="font-mono">{certificateId}</span> was issued by DigitalPadhai.
+        </p>
+      </div>
+    );
+  }
+
+  return (
+    <div className="max-w-md p-6 mx-auto mt-16 text-center bg-green-50 rounded-lg">
+      <BadgeCheck className="w-12 h-12 mx-auto mb-4 text-green-600" />
+      <h3 className="mb-4 text-xl font-semibold text-green-700">Verified certificate</h3>
+      <p className="text-gray-700">
+        <span className="font-semibold">{data.student_name}</span> completed{" "}
+        <span className="font-semibold">{data.course_title}</span>
+      </p>
+      <p className="mt-2 text-sm text-gray-600">Issued on {data.issued_at}</p>
+      <p className="mt-1 text-sm text-gray-600">
+        Certificate ID: <span className="font-mono">{data.certificate_id}</span>
+      </p>
+    </div>
+  );
+};
+
+export default VerifyCertificate;
@@ -1,67 +1,77 @@
-import React, { useState, useMemo } from 'react';
-import { useLoadCourseQuery, useSearchCoursesQuery } from '@/features/api/courseApi';
-import { useLoadCategoryQuery } from '@/features/api/categoryApi';
+import React, { useState, useMemo, useEffect } from 'react';
+import { useSearchCoursesQuery } from '@/features/api/courseApi';
 import Course from './Course';
 
+const LEVEL_LABELS = { beginner: 'Beginner', intermediate: 'Intermediate', advanced: 'Advanced' };
+const PRICE_LABELS = { free: 'Free', under_1000: 'Under Rs 1000', '1000_to_5000': 'Rs 1000 - 5000', over_5000: 'Over Rs 5000' };
+
+// One server-side facet (level, price) with the number of courses behind each value
+const FacetOptions = ({ title, options = [], labels, selected, onSelect }) => (
+  <div className="mt-6">
+    <h3 className="font-medium text-gray-800 mb-3">{title}</h3>
+    <div className="space-y-1">
+      {options.map(option => (
+        <button
+          key={option.value}
+          className={`w-full flex justify-between text-left px-3 py-2 text-sm rounded ${
+            selected === option.value
+              ? 'bg-blue-50 text-blue-700'
+              : 'text-gray-700 hover:bg-gray-100'
+          }`}
+          onClick={() => onSelect(selected === option.value ? '' : option.value)}
+        >
+          <span>{labels[option.value] || option.value}</span>
+          <span className="text-gray-400">{option.count}</span>
+        </button>
+      ))}
+    </div>
+  </div>
+);
+
 const AllCourse = () => {
   // Search state
   const [searchQuery, setSearchQuery] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('all');
+  const [selectedLevel, setSelectedLevel] = useState('');
+  const [selectedPrice, setSelectedPrice] = useState('');
   const [categoryQuery, setCategoryQuery] = useState('');
   const [sortOrder, setSortOrder] = useState('default');
   const [mobileFiltersOpen, setMobileFiltersOpen] = useState(false);
   const [searchField, setSearchField] = useState('both'); // 'title', 'keywords', or 'both'
+  const [searchCursor, setSearchCursor] = useState(''); // last page loaded with "Load more"
 
-  // Data
-  const {
-    data: coursesRaw,
-    error: coursesError,
-    isLoading: coursesLoading
-  } = useLoadCourseQuery();
-
-  const {
-    data: categoriesRaw,
-    error: catError,
-    isLoading: catLoading
-  } = useLoadCategoryQuery();
+  // A changed search or filter starts again from the first page
+  useEffect(() => {
+    setSearchCursor('');
+  }, [searchQuery, searchField, sortOrder, selectedCategory, selectedLevel, selectedPrice]);
 
-  // Search query using trigram similarity
+  // Browsing and searching both go through the search endpoint: the server
+  // filters, sorts and pages the catalog and returns the facet counts
   const {
     data: searchResults,
     error: searchError,
-    isLoading: searchLoading
-  } = useSearchCoursesQuery(
-    { q: searchQuery, field: searchField, sort: sortOrder },
-    { skip: !searchQuery.trim() } // Only run when there's a search query
-  );
-
-  // Normalize courses
-  const courses = useMemo(() => {
-    if (!coursesRaw) return [];
-    if (Array.isArray(coursesRaw)) return coursesRaw;
-    if (Array.isArray(coursesRaw.results)) return coursesRaw.results;
-    if (Array.isArray(coursesRaw.data)) return coursesRaw.data;
-    return [];
-  }, [coursesRaw]);
+    isLoading: searchLoading,
+    isFetching: searchFetching
+  } = useSearchCoursesQuery({
+    q: searchQuery,
+    field: searchField,
+    sort: sortOrder === 'default' ? '' : sortOrder,
+    cursor: searchCursor,
+    filters: {
+      category: selectedCategory === 'all' ? '' : selectedCategory,
+      level: selectedLevel,
+      price: selectedPrice,
+    },
+  });
 
-  // Normalize search results
-  const normalizedSearchResults = useMemo(() => {
-    if (!searchQuery.trim()) return null;
-    if (!searchResults) return [];
-    if (Array.isArray(searchResults)) return searchResults;
-    if (Array.isArray(searchResults.results)) return searchResults.results;
-    if (Array.isArray(searchResults.data)) return searchResults.data;
-    return [];
-  }, [searchResults, searchQuery]);
+  const filteredCourses = searchResults?.results || [];
+  const facets = searchResults?.facets || {};
 
-  // Normalize categories
-  const categories = useMemo(() => {
-    if (!categoriesRaw) return [];
-    if (Array.isArray(categoriesRaw)) return categoriesRaw;
-    if (Array.isArray(categoriesRaw.results)) return categoriesRaw.results;
-    if (Array.isArray(categoriesRaw.data)) return categoriesRaw.data;
-    return [];
-  }, [categoriesRaw]);
+  // Categories with their course counts
+  const categories = useMemo(
+    () => (facets.category || []).map(c => ({ id: c.value, slug: c.value, title: c.label, count: c.count })),
+    [facets.category]
+  );
 
   // Filter categories list by local query
   const visibleCategories = useMemo(() => {
@@ -72,29 +82,6 @@ const AllCourse = () => {
     );
   }, [categories, categoryQuery]);
 
-  // Courses after category + search + sort
-  const filteredCourses = useMemo(() => {
-    // Use search results if available, otherwise use all courses
-    let list = normalizedSearchResults || courses;
-
-    // Category filter (by slug) - only apply if not using search results
-    // because search API might not return category data in the same format
-    if (selectedCategory !== 'all' && !normalizedSearchResults) {
-      list = list.filter(c => c.category && c.category.slug === selectedCategory);
-    }
-
-    // For client-side sorting when not using search API sorting
-    if (!normalizedSearchResults) {
-      if (sortOrder === 'price-asc') {
-        list = [...list].sort((a, b) => (a.price || 0) - (b.price || 0));
-      } else if (sortOrder === 'price-desc') {
-        list = [...list].sort((a, b) => (b.price || 0) - (a.price || 0));
-      }
-    }
-
-    return list;
-  }, [normalizedSearchResults, courses, selectedCategory, sortOrder]);
-
   const handleSearchSubmit = (e) => {
     e.preventDefault();
     // The search is handled by the useSearchCoursesQuery hook
@@ -184,8 +171,8 @@ const AllCourse = () => {
                 className="border border-gray-300 rounded px-3 py-2 text-sm focus:outline-none focus:ring-1 focus:ring-blue-500"
               >
                 <option value="default">Default</option>
-                <option value="price-asc">Price: Low to High</option>
-                <option value="price-desc">Price: High to Low</option>
+                <option value="price_asc">Price: Low to High</option>
+                <option value="price_desc">Price: High to Low</option>
               </select>
             </div>
           </div>
@@ -203,7 +190,7 @@ const AllCourse = () => {
             </svg>
           </button>
           <div className="text-sm text-gray-500">
-            {filteredCourses.length} course{filteredCourses.length !== 1 ? 's' : ''}
+            {filteredCourses.length}{searchResults?.next ? '+' : ''} course{filteredCourses.length !== 1 ? 's' : ''}
           </div>
         </div>
 
@@ -260,11 +247,28 @@ const AllCourse = () => {
                         }`}
                         onClick={() => setSelectedCategory(cat.slug)}
                       >
-                        {cat.title}
+                        <span className="flex justify-between">
+                          <span>{cat.title}</span>
+                          <span className="text-gray-400">{cat.count}</span>
+                        </span>
                       </button>
                     ))}
                 </div>
               </div>
+              <FacetOptions
+                title="Level"
+                options={facets.level}
+                labels={LEVEL_LABELS}
+                selected={selectedLevel}
+                onSelect={setSelectedLevel}
+              />
+              <FacetOptions
+                title="Price"
+                options={facets.price}
+                labels={PRICE_LABELS}
+                selected={selectedPrice}
+                onSelect={setSelectedPrice}
+              />
             </div>
           )}
 
@@ -294,13 +298,13 @@ const AllCourse = () => {
                 />
               </div>
 
-              {catLoading ? (
+              {searchLoading ? (
                 <div className="space-y-2">
                   {Array.from({ length: 5 }).map((_, idx) => (
                     <div key={idx} className="h-8 bg-gray-100 rounded animate-pulse" />
                   ))}
                 </div>
-              ) : catError ? (
+              ) : searchError ? (
                 <p className="text-red-500 text-sm">Failed to load categories</p>
               ) : (
                 <div className="space-y-1 max-h-80 overflow-y-auto">
@@ -327,11 +331,28 @@ const AllCourse = () => {
                         }`}
                         onClick={() => setSelectedCategory(cat.slug)}
                       >
-                        {cat.title}
+                        <span className="flex justify-between">
+                          <span>{cat.title}</span>
+                          <span className="text-gray-400">{cat.count}</span>
+                        </span>
                       </button>
                     ))}
                 </div>
               )}
+              <FacetOptions
+                title="Level"
+                options={facets.level}
+                labels={LEVEL_LABELS}
+                selected={selectedLevel}
+                onSelect={setSelectedLevel}
+              />
+              <FacetOptions
+                title="Price"
+                options={facets.price}
+                labels={PRICE_LABELS}
+                selected={selectedPrice}
+                onSelect={setSelectedPrice}
+              />
             </div>
           </aside>
 
@@ -364,11 +385,11 @@ const AllCourse = () => {
               </div>
               
               <div className="text-sm text-gray-500">
-                {filteredCourses.length} course{filteredCourses.length !== 1 ? 's' : ''}
+                {filteredCourses.length}{searchResults?.next ? '+' : ''} course{filteredCourses.length !== 1 ? 's' : ''}
               </div>
             </div>
 
-            {(coursesLoading || searchLoading) ? (
+            {searchLoading ? (
               <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
                 {Array.from({ length: 6 }).map((_, i) => (
                   <div key={i} className="bg-white rounded-lg border overflow-hidden">
@@ -381,7 +402,7 @@ const AllCourse = () => {
                   </div>
                 ))}
               </div>
-            ) : (coursesError || searchError) ? (
+            ) : searchError ? (
               <div className="text-center py-12">
                 <div className="text-gray-400 mb-4">
                   <svg xmlns="http://www.w3.org/2000/svg" className="h-12 w-12 mx-auto" fill="none" viewBox="0 0 24 24" stroke="currentColor">
@@ -400,11 +421,13 @@ const AllCourse = () => {
                 </div>
                 <h3 className="text-gray-700">No courses found</h3>
                 <p className="text-gray-500 text-sm mt-1">Try adjusting your search or filters</p>
-                {(searchQuery || selectedCategory !== 'all') && (
+                {(searchQuery || selectedCategory !== 'all' || selectedLevel || selectedPrice) && (
                   <button
                     onClick={() => {
                       setSearchQuery('');
                       setSelectedCategory('all');
+                      setSelectedLevel('');
+                      setSelectedPrice('');
                     }}
                     className="mt-4 px-4 py-2 bg-blue-600 text-white text-sm rounded hover:bg-blue-700"
                   >
@@ -413,11 +436,24 @@ const AllCourse = () => {
                 )}
               </div>
             ) : (
-              <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
-                {filteredCourses.map(course => (
-                  <Course key={course.id} course={course} />
-                ))}
-              </div>
+              <>
+                <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
+                  {filteredCourses.map(course => (
+                    <Course key={course.id} course={course} />
+                  ))}
+                </div>
+                {searchResults?.next && (
+                  <div className="text-center mt-8">
+                    <button
+                      onClick={() => setSearchCursor(searchResults.next)}
+                      disabled={searchFetching}
+                      className="px-4 py-2 text-sm border border-gray-300 rounded hover:bg-gray-50 disabled:opacity-50"
+                    >
+                      {searchFetching ? 'Loading...' : 'Load more'}
+                    </button>
+                  </div>
+                )}
+              </>
             )}
           </main>
         </div>
@@ -9,6 +9,19 @@ import Confetti from "react-confetti";
 import { useWindowSize } from "@uidotdev/usehooks";
 import { Download } from "lucide-react";
 
+const downloadFile = async (url, fileName) => {
+  const res = await fetch(url);
+  const blob = await res.blob();
+  const objectUrl = window.URL.createObjectURL(blob);
+  const a = document.createElement("a");
+  a.href = objectUrl;
+  a.download = fileName;
+  document.body.appendChild(a);
+  a.click();
+  a.remove();
+  window.URL.revokeObjectURL(objectUrl);
+};
+
 const Certificate = () => {
   const { slug } = useParams();
   const [certificate, setCertificate] = useState(null);
@@ -17,12 +30,14 @@ const Certificate = () => {
   const [hasTriedGenerating, setHasTriedGenerating] = useState(false);
   const { width, height } = useWindowSize();
 
+  // Certificates are rendered in the background: poll until the file is ready
+  const isPending = certificate?.status === "pending";
   const {
     data: certificates,
     isLoading: loadingCertificates,
     isError: errorFetchingCertificates,
     refetch: refetchCertificates,
-  } = useGetMyCertificatesQuery();
+  } = useGetMyCertificatesQuery(undefined, { pollingInterval: isPending ? 3000 : 0 });
 
   const [
     generateCertificate,
@@ -38,7 +53,7 @@ const Certificate = () => {
       const certForCourse = certificates.find((cert) => cert.course_slug === slug);
       if (certForCourse) {
         setCertificate(certForCourse);
-        setShowConfetti(true);
+        setShowConfetti(certForCourse.status === "ready");
       } else if (!hasTriedGenerating) {
         // Only try to generate once
         setHasTriedGenerating(true);
@@ -46,7 +61,7 @@ const Certificate = () => {
           .unwrap()
           .then((res) => {
             setCertificate(res);
-            setShowConfetti(true);
+            setShowConfetti(res.status === "ready");
           })
           .catch((err) => {
             console.error("Certificate generation error:", err);
@@ -141,47 +156,65 @@ const Certificate = () => {
           <>
           
             <div className="p-4 bg-white rounded-lg">
-              <Button
-              onClick={async () => {
-                const res = await fetch(certificate.download_url);
-                const blob = await res.blob();
-                const url = window.URL.createObjectURL(blob);
-                const a = document.createElement("a");
-                a.href = url;
-                a.download = `certificate_${certificate.certificate_id}.png`;
-                document.body.appendChild(a);
-                a.click();
-                a.remove();
-                window.URL.revokeObjectURL(url);
-              }}
-            >
-              <Download></Download>
-              Download
-            </Button>
+              <div className="flex gap-2">
+                <Button
+                  onClick={() => downloadFile(certificate.download_url, `certificate_${certificate.certificate_id}.png`)}
+                >
+                  <Download></Download>
+                  Download
+                </Button>
+                {certificate.certificate_pdf_url && (
+                  <Button
+                    variant="outline"
+                    onClick={() => downloadFile(certificate.certificate_pdf_url, `certificate_${certificate.certificate_id}.pdf`)}
+                  >
+                    <Download></Download>
+                    PDF
+                  </Button>
+                )}
+              </div>
+              <p className="mt-2 text-sm text-gray-600">
+                Anyone can verify this certificate at{" "}
+                <a
+                  href={`/verify/${certificate.certificate_id}`}
+                  className="text-green-600 underline"
+                >
+                  {`${window.location.origin}/verify/${certificate.certificate_id}`}
+                </a>
+              </p>
               <img
-                src={certificate.certificate_file}
+                src={certificate.certificate_preview_url || certificate.certificate_file}
                 alt={`Certificate for completing ${certificate.course_slug}`}
                 className="w-full max-w-2xl mx-auto mt-2"
               />
             </div>
             
           </>
-        ) : (
-          <div className="p-6 text-center bg-yellow-50 rounded-lg">
-            <h3 className="text-lg font-semibold text-yellow-700 mb-2">
-              Certificate Generated but File Not Ready
+        ) : certificate?.status === "failed" ? (
+          <div className="p-6 text-center bg-red-50 rounded-lg">
+            <h3 className="text-lg font-semibold text-red-600 mb-2">
+              Certificate Could Not Be Created
             </h3>
             <p className="text-gray-700">
-              {/* Your certificate ID is {certificate.certificate_id}, but the file is still processing. */}
-              Please try again in a few moments.
+              Something went wrong while preparing your certificate.
             </p>
             <Button
               className="mt-4"
-              onClick={() => refetchCertificates()}
+              onClick={() => generateCertificate(slug).unwrap().then(setCertificate)}
             >
-              Refresh
+              Try Again
             </Button>
           </div>
+        ) : (
+          <div className="flex flex-col items-center p-6 text-center bg-yellow-50 rounded-lg">
+            <div className="w-10 h-10 mb-4 border-4 border-gray-300 border-t-green-500 rounded-full animate-spin" />
+            <h3 className="text-lg font-semibold text-yellow-700 mb-2">
+              Preparing Your Certificate
+            </h3>
+            <p className="text-gray-700">
+              This only takes a few moments. The page will update when it is ready.
+            </p>
+          </div>
         )}
       </div>
     </div>
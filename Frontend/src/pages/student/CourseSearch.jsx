@@ -12,6 +12,8 @@ const CourseSearch = () => {
     const [query, setQuery] = useState(queryParam);
     const [debouncedQuery, setDebouncedQuery] = useState(queryParam);
     const [showResults, setShowResults] = useState(false);
+    // cursor of the last page loaded with "Load more" ('' = first page)
+    const [cursor, setCursor] = useState('');
 
     // Update debouncedQuery only after user stops typing
     useEffect(() => {
@@ -35,10 +37,18 @@ const CourseSearch = () => {
         }
     }, [debouncedQuery, setSearchParams]);
 
-    const { data: results = [], isFetching, isError } = useSearchCoursesQuery(
-        { q: debouncedQuery },
+    // A new search starts again from the first page
+    useEffect(() => {
+        setCursor('');
+    }, [debouncedQuery]);
+
+    const { data, isFetching, isError } = useSearchCoursesQuery(
+        { q: debouncedQuery, cursor },
         { skip: !debouncedQuery || debouncedQuery.length < 2 }
     );
+    const results = data?.results ?? [];
+    const nextCursor = data?.next;
+    const isLoadingMore = isFetching && Boolean(cursor);
 
     // Reset query when URL param changes
     useEffect(() => {
@@ -101,7 +111,7 @@ const CourseSearch = () => {
             {showResults && debouncedQuery && debouncedQuery.length >= 2 && (
                 <div className="mb-8">
                     {/* Status Messages */}
-                    {isFetching && (
+                    {isFetching && !isLoadingMore && (
                         <div className="text-center py-8">
                             <div className="inline-flex items-center gap-2 text-gray-500">
                                 <div className="animate-spin rounded-full h-4 w-4 border-b-2 border-blue-500"></div>
@@ -110,10 +120,10 @@ const CourseSearch = () => {
                         </div>
                     )}
 
-                    {!isFetching && !isError && results.length > 0 && (
+                    {(!isFetching || isLoadingMore) && !isError && results.length > 0 && (
                         <div className="mb-6">
                             <div className="text-center text-gray-600 mb-6">
-                                <span className="font-medium">{results.length}</span> course{results.length !== 1 ? 's' : ''} found for "{debouncedQuery}"
+                                <span className="font-medium">{results.length}{nextCursor ? "+" : ""}</span> course{results.length !== 1 ? 's' : ''} found for "{debouncedQuery}"
                             </div>
 
                             <div
@@ -125,6 +135,18 @@ const CourseSearch = () => {
                                     <Course key={course.id} course={course} />
                                 ))}
                             </div>
+
+                            {nextCursor && (
+                                <div className="text-center mt-6">
+                                    <button
+                                        onClick={() => setCursor(nextCursor)}
+                                        disabled={isLoadingMore}
+                                        className="px-4 py-2 text-sm border border-gray-300 rounded-lg bg-white hover:bg-gray-50 disabled:opacity-50"
+                                    >
+                                        {isLoadingMore ? 'Loading...' : 'Load more'}
+                                    </button>
+                                </div>
+                            )}
                         </div>
                     )}
 